@@ -0,0 +1,150 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+ANSWER_CACHE_PATH = os.path.join("store", "answer_cache.sqlite")
+SIMILARITY_THRESHOLD = float(os.environ.get("ANSWER_CACHE_THRESHOLD", "0.95"))
+TTL_SECONDS = 7 * 24 * 3600
+MAX_ENTRIES = 5000
+
+
+def doc_set_fingerprint(file_hashes):
+    """Answers are only reused for exactly the same set of documents."""
+    return hashlib.md5("\n".join(sorted(file_hashes)).encode("utf-8")).hexdigest()
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class AnswerCache:
+    """
+    Semantic answer cache persisted in SQLite. A question reuses a stored
+    answer for the same document set when the cosine similarity of the
+    query embeddings is above the threshold and the entry has not expired.
+    """
+
+    def __init__(self, path=ANSWER_CACHE_PATH, threshold=SIMILARITY_THRESHOLD,
+                 ttl=TTL_SECONDS, max_entries=MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._matrices = {}  # doc_set -> (row ids, answers, normalized embedding matrix)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " doc_set TEXT NOT NULL,"
+            " query TEXT NOT NULL,"
+            " embedding BLOB NOT NULL,"
+            " answer TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_doc_set ON answers (doc_set)")
+        self._conn.commit()
+
+    def _load_matrix(self, doc_set):
+        if doc_set not in self._matrices:
+            rows = self._conn.execute(
+                "SELECT id, answer, embedding FROM answers"
+                " WHERE doc_set = ? AND created >= ? AND length(embedding) > 0",
+                (doc_set, time.time() - self.ttl)
+            ).fetchall()
+            ids = [row[0] for row in rows]
+            answers = [row[1] for row in rows]
+            matrix = (
+                np.vstack([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+                if rows else None
+            )
+            self._matrices[doc_set] = (ids, answers, matrix)
+        return self._matrices[doc_set]
+
+    def lookup(self, doc_set, query_vector):
+        """Return (answer, similarity) for the closest cached question, or None."""
+        with self._lock:
+            ids, answers, matrix = self._load_matrix(doc_set)
+            if matrix is None:
+                self.misses += 1
+                return None
+
+            similarities = matrix @ _normalize(query_vector)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (time.time(), ids[best]))
+            self._conn.commit()
+            self.hits += 1
+            return answers[best], float(similarities[best])
+
+    def lookup_exact(self, doc_set, query):
+        """Return the answer cached for exactly this question text, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, answer FROM answers WHERE doc_set = ? AND query = ? AND created >= ?"
+                " ORDER BY last_used DESC LIMIT 1",
+                (doc_set, query, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (time.time(), row[0]))
+            self._conn.commit()
+            self.hits += 1
+            return row[1]
+
+    def put(self, doc_set, query, query_vector, answer):
+        """Store an answer. Without query_vector it is only found by lookup_exact."""
+        embedding = _normalize(query_vector).tobytes() if query_vector is not None else b""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO answers (doc_set, query, embedding, answer, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_set, query, embedding, answer, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+            self._matrices.clear()
+
+    def _evict(self, now):
+        """Drop expired entries, then the least recently used ones above max_entries."""
+        self._conn.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM answers WHERE id IN ("
+            " SELECT id FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """One answer cache per process, shared by every session."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+        return _cache
@@ -0,0 +1,59 @@
+"""
+Benchmark: whole-file MD5 (old get_file_hash) vs streamed MD5 vs manifest fast path.
+
+Usage:
+    python bench_fingerprint.py [size_mb]
+"""
+import os
+import sys
+import time
+import hashlib
+import tempfile
+import tracemalloc
+from fingerprint import hash_file, get_fingerprint, record_fingerprint
+
+
+def old_get_file_hash(pdf_path):
+    """The previous implementation: read the whole file into memory."""
+    hasher = hashlib.md5()
+    with open(pdf_path, 'rb') as f:
+        buf = f.read()
+        hasher.update(buf)
+    return hasher.hexdigest()
+
+
+def measure(label, fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:>10.1f} ms   peak {peak / (1024 * 1024):>8.1f} MB")
+    return result
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "sample.pdf")
+        store_path = os.path.join(tmp, "store")
+
+        # Write random-ish data in chunks so the generator itself stays small
+        with open(pdf_path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        print(f"File size: {size_mb} MB")
+        old = measure("f.read() + md5", old_get_file_hash, pdf_path)
+        new = measure("streamed md5", hash_file, pdf_path)
+        assert old == new, "streamed hash must match the old hash"
+
+        record_fingerprint(pdf_path, store_path, new)
+        cached = measure("manifest fast path", get_fingerprint, pdf_path, store_path)
+        assert cached == new
+
+
+if __name__ == "__main__":
+    main()
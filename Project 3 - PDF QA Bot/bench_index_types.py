@@ -0,0 +1,63 @@
+"""
+Benchmark: recall@k and query latency of IVF-Flat, HNSW and IVF-PQ against the
+exact flat index, on synthetic clustered vectors (no API calls).
+
+Usage:
+    python bench_index_types.py [num_vectors] [dim]
+"""
+import os
+import sys
+import time
+import faiss
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.index_factory import build_index, tune_index
+from common.bench_data import clustered_vectors, sample_queries, index_size_mb, percentiles
+
+K = 10
+NUM_QUERIES = 200
+
+
+def run(label, index, queries, truth):
+    latencies = []
+    found = 0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query.reshape(1, -1), K)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found += len(set(ids[0]) & set(truth[i]))
+    recall = found / (len(queries) * K)
+    p50, p95 = percentiles(latencies)
+    print(f"{label:<26} recall@{K} {recall:6.3f}   p50 {p50:7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 1536
+    faiss.omp_set_num_threads(1)  # per-query latency, as in the app
+
+    vectors = clustered_vectors(n, dim)
+    queries = sample_queries(vectors, NUM_QUERIES)
+
+    flat = build_index(vectors, index_type="flat")
+    _, truth = flat.search(queries, K)
+    print(f"{n} vectors x {dim} dims")
+    print(f"{'flat':<26} size {index_size_mb(flat):8.1f} MB")
+    run("flat", flat, queries, truth)
+
+    for index_type, knob, values in (
+        ("ivf_flat", "nprobe", (4, 16, 64)),
+        ("hnsw", "ef_search", (16, 64, 256)),
+        ("ivf_pq", "nprobe", (4, 16, 64)),
+    ):
+        start = time.perf_counter()
+        index = build_index(vectors, index_type=index_type)
+        build_s = time.perf_counter() - start
+        print(f"{index_type:<26} size {index_size_mb(index):8.1f} MB   build {build_s:7.1f} s")
+        for value in values:
+            tune_index(index, **{knob: value})
+            run(f"  {knob}={value}", index, queries, truth)
+
+
+if __name__ == "__main__":
+    main()
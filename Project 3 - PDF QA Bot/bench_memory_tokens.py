@@ -0,0 +1,53 @@
+"""
+Benchmark: chat-history tokens sent to the question-condensing step per turn,
+unbounded ConversationBufferMemory vs BoundedSummaryMemory, over a long session.
+
+A fake LLM writes the summaries, so no API calls are made.
+
+Usage:
+    python bench_memory_tokens.py [turns]
+"""
+import sys
+from langchain_community.llms.fake import FakeListLLM
+from chat_memory import create_memory, count_message_tokens
+
+SUMMARY = (
+    "The user asked about the onboarding policy, leave rules and expense limits; "
+    "the assistant quoted the relevant sections of the uploaded PDFs."
+)
+
+
+def history_tokens(memory):
+    messages = memory.load_memory_variables({})["chat_history"]
+    return count_message_tokens(messages)
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    llm = FakeListLLM(responses=[SUMMARY])
+    memories = {
+        "buffer": create_memory(llm, mode="buffer"),
+        "summary": create_memory(llm, mode="summary"),
+    }
+    totals = dict.fromkeys(memories, 0)
+
+    print(f"{'turn':>5} {'buffer':>10} {'summary':>10}")
+    for turn in range(1, turns + 1):
+        question = f"Question {turn}: what does section {turn} of the policy say about approvals?"
+        answer = f"Answer {turn}: " + "Section text quoted from the document. " * 12
+
+        row = []
+        for name, memory in memories.items():
+            tokens = history_tokens(memory)
+            totals[name] += tokens
+            row.append(tokens)
+            memory.save_context({"question": question}, {"answer": answer})
+
+        if turn % 5 == 0 or turn == 1:
+            print(f"{turn:>5} {row[0]:>10} {row[1]:>10}")
+
+    print(f"{'mean':>5} {totals['buffer'] / turns:>10.0f} {totals['summary'] / turns:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
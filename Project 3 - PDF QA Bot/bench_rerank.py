@@ -0,0 +1,88 @@
+"""
+Benchmark: default top-4 retrieval vs retrieve-50 + cross-encoder re-rank to
+top-3, on saved stores and a small labelled question set.
+
+questions.jsonl holds one {"question": ..., "page": <1-based page number>}
+per line: the page that answers the question. Reports hit rate and MRR of
+the expected page, prompt tokens of the retrieved context, and latency; then
+cross-encoder throughput per batch size with a cold and a warm score cache.
+
+Usage:
+    python bench_rerank.py questions.jsonl store/<pdf> [store/<pdf> ...]
+"""
+import sys
+import json
+import time
+from embedder import get_embeddings
+from store_format import load_store
+from bm25_index import load_keyword_index
+from retriever import MultiIndexStore
+from chunker import count_tokens
+from qa_engine import create_retriever
+from reranker import CrossEncoderReranker, get_reranker
+
+
+def evaluate(label, retriever, questions):
+    hits, reciprocal_ranks, tokens, latencies = 0, 0.0, 0, []
+    for item in questions:
+        start = time.perf_counter()
+        docs = retriever.invoke(item["question"])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        pages = [doc.metadata.get("page", 0) + 1 for doc in docs]
+        if item["page"] in pages:
+            hits += 1
+            reciprocal_ranks += 1 / (pages.index(item["page"]) + 1)
+        tokens += sum(count_tokens(doc.page_content) for doc in docs)
+
+    n = len(questions)
+    latencies.sort()
+    print(
+        f"{label:<22} hit {hits / n:6.2%}   MRR {reciprocal_ranks / n:5.3f}   "
+        f"prompt tokens {tokens / n:6.0f}   "
+        f"p50 {latencies[n // 2]:7.1f} ms   p95 {latencies[int(n * 0.95)]:7.1f} ms"
+    )
+
+
+def throughput(questions, retriever):
+    pairs = [(item["question"], retriever.invoke(item["question"])) for item in questions[:10]]
+    texts = sum(len(docs) for _, docs in pairs)
+    for batch_size in (1, 8, 16, 32):
+        reranker = CrossEncoderReranker(batch_size=batch_size)
+        for label in ("cold", "warm"):
+            start = time.perf_counter()
+            for query, docs in pairs:
+                reranker.score(query, [doc.page_content for doc in docs])
+            elapsed = time.perf_counter() - start
+            print(f"batch {batch_size:>3} {label}: {texts / elapsed:8.0f} pairs/s")
+
+
+def main():
+    with open(sys.argv[1], encoding="utf-8") as f:
+        questions = [json.loads(line) for line in f if line.strip()]
+
+    embeddings = get_embeddings()
+    stores = []
+    for folder in sys.argv[2:]:
+        store = load_store(folder, embeddings)
+        store.keyword_index = load_keyword_index(store, folder)
+        stores.append(store)
+    combined = MultiIndexStore(stores, embeddings)
+
+    # Uncompressed, so both runs return whole chunks and reranked.base_retriever is the fetch-50 search
+    baseline = create_retriever(combined, rerank=False, compress=False)
+    reranked = create_retriever(combined, rerank=True, compress=False)
+
+    # Warm the embedding cache so both runs time retrieval, not API calls
+    for item in questions:
+        baseline.invoke(item["question"])
+
+    evaluate("top-4", baseline, questions)
+    evaluate("top-50 -> rerank top-3", reranked, questions)
+    print(f"Score cache: {get_reranker().stats()}")
+
+    throughput(questions, reranked.base_retriever)
+
+
+if __name__ == "__main__":
+    main()
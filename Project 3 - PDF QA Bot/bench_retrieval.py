@@ -0,0 +1,186 @@
+"""
+Retrieval regression benchmark: ingest one PDF under several chunking, index
+and retriever configurations and score them against a labelled question set.
+Uses a deterministic local hashing embedding, so numbers are reproducible
+and no API calls are made.
+
+questions.jsonl holds one {"question": ..., "page": <1-based page>} (or
+"pages": [...]) per line. Chunker specs are <kind>-<size>-<overlap>:
+"chars" is the RecursiveCharacterTextSplitter (P1 RAG uses chars-1500-0,
+the old QA bot chars-500-50), "tokens" runs the QA bot's ingestion path,
+pdf_loader.iter_pdf_chunks (token chunker, header/footer stripping, dedup),
+with the given chunk size.
+
+Reports hit@k (a relevant page among the top k), MRR@10, build time
+(parse + chunk + embed + index), index memory and query p50/p95 per
+configuration. --json saves the rows and --baseline prints the change
+against a previous run, so they can be tracked over time.
+
+Usage:
+    python bench_retrieval.py file.pdf questions.jsonl \
+        [--chunkers chars-500-50,chars-1500-0,tokens-300-40] \
+        [--indexes flat,hnsw] [--retrievers similarity,hybrid] \
+        [--json results.json] [--baseline previous.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import faiss
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from pdf_loader import iter_pdf_pages, iter_pdf_chunks, count_pages
+from chunker import TokenChunker
+from bm25_index import build_keyword_index
+from retriever import MultiIndexStore
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.hashing_embeddings import HashingEmbeddings
+from common.index_factory import build_index
+
+KS = (1, 3, 5, 10)
+
+
+def make_chunks(pdf_path, spec):
+    kind, size, overlap = spec.split("-")
+    size, overlap = int(size), int(overlap)
+
+    if kind == "chars":
+        splitter = RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap)
+        return splitter.split_documents(iter_pdf_pages(pdf_path))
+    if kind != "tokens":
+        raise ValueError(f"Unknown chunker kind: {kind}")
+
+    # The app's own ingestion path, with the chunk size under test
+    splitter = TokenChunker(max_tokens=size, overlap_tokens=overlap)
+    return list(iter_pdf_chunks(pdf_path, splitter=splitter))
+
+
+def build_store(chunks, embeddings, index_type):
+    texts = [chunk.page_content for chunk in chunks]
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype="float32")
+    store = FAISS.from_embeddings(
+        list(zip(texts, vectors.tolist())), embeddings,
+        metadatas=[chunk.metadata for chunk in chunks]
+    )
+    if index_type != "flat":
+        store.index = build_index(vectors, index_type=index_type)
+    store.keyword_index = build_keyword_index(store)
+    return store
+
+
+def index_memory_mb(store):
+    text_bytes = sum(len(doc.page_content.encode("utf-8")) for doc in store.docstore._dict.values())
+    return (faiss.serialize_index(store.index).nbytes + text_bytes) / (1024 * 1024)
+
+
+def evaluate(retriever, questions):
+    hits = dict.fromkeys(KS, 0)
+    reciprocal_ranks = 0.0
+    latencies = []
+    for item in questions:
+        expected = set(item.get("pages") or [item["page"]])
+        start = time.perf_counter()
+        docs = retriever.invoke(item["question"])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        pages = [doc.metadata.get("page", 0) + 1 for doc in docs]
+        rank = next((i for i, page in enumerate(pages, start=1) if page in expected), None)
+        if rank is not None:
+            reciprocal_ranks += 1 / rank
+            for k in KS:
+                hits[k] += rank <= k
+
+    n = len(questions)
+    latencies.sort()
+    row = {f"hit@{k}": hits[k] / n for k in KS}
+    row.update(
+        mrr=reciprocal_ranks / n,
+        p50_ms=latencies[n // 2],
+        p95_ms=latencies[int(n * 0.95)],
+    )
+    return row
+
+
+def print_row(row, baseline=None):
+    line = (
+        f"{row['config']:<34} {row['chunks']:>6} {row['build_s']:>7.2f} {row['memory_mb']:>7.1f} "
+        + " ".join(f"{row[f'hit@{k}']:>6.3f}" for k in KS)
+        + f" {row['mrr']:>6.3f} {row['p50_ms']:>7.2f} {row['p95_ms']:>7.2f}"
+    )
+    print(line)
+    if baseline:
+        print(
+            f"{'  Δ vs baseline':<34} {row['chunks'] - baseline['chunks']:>+6} "
+            f"{row['build_s'] - baseline['build_s']:>+7.2f} {row['memory_mb'] - baseline['memory_mb']:>+7.1f} "
+            + " ".join(f"{row[f'hit@{k}'] - baseline[f'hit@{k}']:>+6.3f}" for k in KS)
+            + f" {row['mrr'] - baseline['mrr']:>+6.3f} {row['p50_ms'] - baseline['p50_ms']:>+7.2f}"
+            f" {row['p95_ms'] - baseline['p95_ms']:>+7.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval quality and latency benchmark")
+    parser.add_argument("pdf")
+    parser.add_argument("questions")
+    parser.add_argument("--chunkers", default="chars-500-50,chars-1500-0,tokens-300-40")
+    parser.add_argument("--indexes", default="flat,hnsw")
+    parser.add_argument("--retrievers", default="similarity,hybrid")
+    parser.add_argument("--json", help="write result rows to this file")
+    parser.add_argument("--baseline", help="earlier --json output to compare against")
+    args = parser.parse_args()
+
+    with open(args.questions, encoding="utf-8") as f:
+        questions = [json.loads(line) for line in f if line.strip()]
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {row["config"]: row for row in json.load(f)}
+        # Earlier runs named hit@k "recall@k"
+        for row in baseline.values():
+            for k in KS:
+                row.setdefault(f"hit@{k}", row.get(f"recall@{k}"))
+
+    embeddings = HashingEmbeddings()
+    faiss.omp_set_num_threads(1)  # per-query latency, as in the app
+
+    print(f"{count_pages(args.pdf)} pages, {len(questions)} questions")
+    print(
+        f"{'config':<34} {'chunks':>6} {'build_s':>7} {'mem_mb':>7} "
+        + " ".join(f"{f'H@{k}':>6}" for k in KS)
+        + f" {'MRR':>6} {'p50_ms':>7} {'p95_ms':>7}"
+    )
+
+    rows = []
+    for spec in args.chunkers.split(","):
+        for index_type in args.indexes.split(","):
+            start = time.perf_counter()
+            chunks = make_chunks(args.pdf, spec)
+            store = build_store(chunks, embeddings, index_type)
+            build_s = time.perf_counter() - start
+            memory_mb = index_memory_mb(store)
+
+            for search_type in args.retrievers.split(","):
+                retriever = MultiIndexStore([store], embeddings).as_retriever(
+                    search_type=search_type,
+                    search_kwargs={"k": max(KS), "fetch_k": 2 * max(KS)}
+                )
+                row = {
+                    "config": f"{spec}/{index_type}/{search_type}",
+                    "chunks": len(chunks),
+                    "build_s": build_s,
+                    "memory_mb": memory_mb,
+                    **evaluate(retriever, questions),
+                }
+                print_row(row, baseline.get(row["config"]))
+                rows.append(row)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: pickle-based FAISS.load_local vs the SQLite + memory-mapped store format.
+
+Builds a synthetic store with random vectors (no API calls), saves it in both
+formats and times repeated loads plus one search per load.
+
+Usage:
+    python bench_store_load.py [num_chunks]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import FAISS
+from store_format import save_store, load_store
+
+DIM = 1536
+RUNS = 5
+
+
+class RandomEmbeddings(Embeddings):
+    """Deterministic stand-in so the benchmark never calls the API."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.standard_normal(DIM).astype("float32").tolist()
+
+
+def time_loads(label, load):
+    query = RandomEmbeddings().embed_query("benchmark query")
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        store = load()
+        store.similarity_search_by_vector(query, k=4)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<24} best {min(timings):>9.1f} ms   mean {sum(timings) / len(timings):>9.1f} ms")
+
+
+def main():
+    num_chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    embeddings = RandomEmbeddings()
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_chunks, DIM)).astype("float32")
+    texts = [f"chunk {i} " + "lorem ipsum " * 40 for i in range(num_chunks)]
+    metadatas = [{"source": "bench.pdf", "page": i // 5} for i in range(num_chunks)]
+
+    store = FAISS.from_embeddings(list(zip(texts, vectors.tolist())), embeddings, metadatas=metadatas)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = os.path.join(tmp, "legacy")
+        new_dir = os.path.join(tmp, "sqlite")
+        store.save_local(legacy_dir)
+        save_store(store, new_dir)
+
+        print(f"{num_chunks} chunks x {DIM} dims")
+        time_loads("pickle load_local", lambda: FAISS.load_local(
+            legacy_dir, embeddings, allow_dangerous_deserialization=True
+        ))
+        time_loads("sqlite + mmap", lambda: load_store(new_dir, embeddings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import re
+import json
+import math
+import heapq
+from collections import Counter, defaultdict
+
+BM25_NAME = "bm25.json"
+TOKEN_RE = re.compile(r"\w+")
+# Tokens such as certificate numbers or part codes: 6+ chars containing a digit
+IDENTIFIER_RE = re.compile(r"\b(?=\w*\d)\w{6,}\b")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring, kept next to each FAISS store."""
+
+    def __init__(self, doc_ids, doc_lengths, postings, k1=1.5, b=0.75):
+        self.doc_ids = doc_ids
+        self.doc_lengths = doc_lengths
+        self.postings = postings  # term -> [[doc_pos, term_frequency], ...]
+        self.k1 = k1
+        self.b = b
+        self.avg_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+
+    @classmethod
+    def build(cls, items):
+        """Build from an iterable of (doc_id, text)."""
+        doc_ids = []
+        doc_lengths = []
+        postings = defaultdict(list)
+        for pos, (doc_id, text) in enumerate(items):
+            tokens = tokenize(text)
+            doc_ids.append(doc_id)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append([pos, tf])
+        return cls(doc_ids, doc_lengths, dict(postings))
+
+    def has_term(self, term):
+        return term.lower() in self.postings
+
+    def search(self, query, k=4):
+        """Return up to k (doc_id, score) pairs, best first."""
+        n = len(self.doc_ids)
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for pos, tf in postings:
+                norm = 1 - self.b + self.b * self.doc_lengths[pos] / (self.avg_length or 1)
+                scores[pos] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.doc_ids[pos], score) for pos, score in best]
+
+    def save(self, folder_path):
+        path = os.path.join(folder_path, BM25_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "doc_ids": self.doc_ids,
+                "doc_lengths": self.doc_lengths,
+                "postings": self.postings,
+            }, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, folder_path):
+        with open(os.path.join(folder_path, BM25_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["doc_ids"], data["doc_lengths"], data["postings"], data["k1"], data["b"])
+
+
+def build_keyword_index(vector_store):
+    """Index every chunk of a FAISS store, in index order."""
+    def items():
+        for pos in sorted(vector_store.index_to_docstore_id):
+            doc_id = vector_store.index_to_docstore_id[pos]
+            yield doc_id, vector_store.docstore.search(doc_id).page_content
+    return BM25Index.build(items())
+
+
+def load_keyword_index(vector_store, folder_path):
+    """Load the saved BM25 index, building it once for stores created before it existed."""
+    try:
+        return BM25Index.load(folder_path)
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        keyword_index = build_keyword_index(vector_store)
+        keyword_index.save(folder_path)
+        return keyword_index
@@ -0,0 +1,51 @@
+import tiktoken
+from langchain.memory import ConversationBufferMemory, ConversationSummaryBufferMemory
+from langchain_core.messages import get_buffer_string
+
+MAX_TURNS = 4             # question/answer pairs kept verbatim
+MAX_HISTORY_TOKENS = 1000  # token budget for the verbatim turns
+
+_encoding = tiktoken.get_encoding("cl100k_base")
+
+
+def count_message_tokens(messages):
+    return len(_encoding.encode(get_buffer_string(messages), disallowed_special=()))
+
+
+class BoundedSummaryMemory(ConversationSummaryBufferMemory):
+    """
+    Keeps the last max_turns turns verbatim, within max_token_limit tokens,
+    and folds older turns into a running summary that is updated
+    incrementally, so the condensing prompt stops growing with the session.
+    """
+
+    max_turns: int = MAX_TURNS
+
+    def prune(self):
+        buffer = self.chat_memory.messages
+        pruned_memory = []
+        # Each turn is a human + AI message pair
+        while buffer and (
+            len(buffer) > 2 * self.max_turns
+            or count_message_tokens(buffer) > self.max_token_limit
+        ):
+            pruned_memory.append(buffer.pop(0))
+
+        if pruned_memory:
+            self.moving_summary_buffer = self.predict_new_summary(
+                pruned_memory, self.moving_summary_buffer
+            )
+
+
+def create_memory(llm, mode="summary"):
+    """Chat memory for the QA chain: "summary" (bounded) or "buffer" (unbounded)."""
+    if mode == "buffer":
+        return ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+
+    return BoundedSummaryMemory(
+        llm=llm,
+        memory_key="chat_history",
+        return_messages=True,
+        max_token_limit=MAX_HISTORY_TOKENS,
+        max_turns=MAX_TURNS,
+    )
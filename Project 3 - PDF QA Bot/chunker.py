@@ -0,0 +1,166 @@
+import re
+import hashlib
+from collections import Counter
+import tiktoken
+from langchain_core.documents import Document
+
+CHUNK_TOKENS = 300     # target upper bound per chunk
+OVERLAP_TOKENS = 40    # trailing sentences repeated at the start of the next chunk
+MIN_CHUNK_TOKENS = 40  # smaller trailing pieces are merged into the previous chunk
+# Bump when chunk boundaries change at the same sizes (sentence splitting, stripping)
+CHUNKER_VERSION = 2
+
+# Saved stores and cache keys record these, so changing the splitter re-chunks old indexes
+SPLITTER_SETTINGS = ("tokens", CHUNK_TOKENS, OVERLAP_TOKENS, MIN_CHUNK_TOKENS, CHUNKER_VERSION)
+
+# A line is a running header/footer if it appears at the top or bottom of this share of pages
+BOILERPLATE_MIN_SHARE = 0.5
+BOILERPLATE_MIN_PAGES = 3
+EDGE_LINES = 3  # lines checked at the top and bottom of each page
+BOILERPLATE_MAX_WORDS = 12  # headers/footers are short; longer repeated lines are content
+
+_encoding = tiktoken.get_encoding("cl100k_base")
+
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+# Only the whitespace is consumed; closing quotes/brackets stay with their sentence
+SENTENCE_RE = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+(?=[\"'(\[]?[A-Z0-9])")
+DIGITS_RE = re.compile(r"\d+")
+
+
+def count_tokens(text):
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def _line_key(line):
+    """Page numbers change from page to page, so digits are ignored when matching."""
+    return DIGITS_RE.sub("#", " ".join(line.split()).lower())
+
+
+def _edge_lines(text):
+    lines = [line for line in text.splitlines() if line.strip()]
+    return lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+
+
+def find_boilerplate(pages):
+    """Line keys that repeat at the top or bottom of most pages (running headers/footers)."""
+    if len(pages) < BOILERPLATE_MIN_PAGES:
+        return set()
+
+    counts = Counter()
+    for text in pages:
+        counts.update({_line_key(line) for line in _edge_lines(text)})
+
+    min_pages = max(BOILERPLATE_MIN_PAGES, BOILERPLATE_MIN_SHARE * len(pages))
+    return {
+        key for key, n in counts.items()
+        if n >= min_pages and key.strip("# ") and len(key.split()) <= BOILERPLATE_MAX_WORDS
+    }
+
+
+def strip_boilerplate(text, boilerplate):
+    """Drop header/footer lines from the edges of one page."""
+    if not boilerplate:
+        return text
+
+    lines = text.splitlines()
+    edges = set()
+    for indexes in (range(len(lines)), reversed(range(len(lines)))):
+        seen = 0
+        for i in indexes:
+            if not lines[i].strip():
+                continue
+            if seen == EDGE_LINES:
+                break
+            seen += 1
+            if _line_key(lines[i]) in boilerplate:
+                edges.add(i)
+    kept = [line for i, line in enumerate(lines) if i not in edges]
+    # Never strip a page down to nothing
+    return "\n".join(kept) if any(line.strip() for line in kept) else text
+
+
+def split_sentences(text):
+    """Paragraphs first, then sentences; line breaks inside a paragraph are joined."""
+    sentences = []
+    for paragraph in PARAGRAPH_RE.split(text):
+        paragraph = " ".join(paragraph.split())
+        if paragraph:
+            sentences.extend(s for s in SENTENCE_RE.split(paragraph) if s.strip())
+    return sentences
+
+
+def _split_long(sentence, max_tokens):
+    """Hard-split a single sentence longer than max_tokens on token boundaries."""
+    tokens = _encoding.encode(sentence, disallowed_special=())
+    return [_encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def _size(sentences):
+    """Token count of sentences joined by single spaces."""
+    return sum(n for _, n in sentences) + max(len(sentences) - 1, 0)
+
+
+class TokenChunker:
+    """
+    Pack whole sentences into chunks of at most max_tokens tokens (tiktoken),
+    carrying up to overlap_tokens of trailing sentences into the next chunk.
+    Only a sentence that alone exceeds the limit is cut mid-sentence.
+    """
+
+    def __init__(self, max_tokens=CHUNK_TOKENS, overlap_tokens=OVERLAP_TOKENS,
+                 min_tokens=MIN_CHUNK_TOKENS):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+
+    def split_text(self, text):
+        pieces = []
+        for sentence in split_sentences(text):
+            n = count_tokens(sentence)
+            if n <= self.max_tokens:
+                pieces.append((sentence, n))
+            else:
+                pieces.extend((part, count_tokens(part)) for part in _split_long(sentence, self.max_tokens))
+
+        chunks = []    # lists of (sentence, tokens)
+        current = []
+        carried = 0    # leading sentences of current that repeat the previous chunk
+        for sentence, n in pieces:
+            if current and _size(current) + n + 1 > self.max_tokens:
+                chunks.append(current)
+                current = self._overlap(current, n)
+                carried = len(current)
+            current.append((sentence, n))
+
+        if len(current) > carried:
+            # Fold a tiny tail into the previous chunk rather than embedding a fragment
+            tail = current[carried:]
+            if chunks and _size(tail) < self.min_tokens and \
+                    _size(chunks[-1]) + _size(tail) <= self.max_tokens + self.min_tokens:
+                chunks[-1] = chunks[-1] + tail
+            else:
+                chunks.append(current)
+
+        return [" ".join(s for s, _ in chunk) for chunk in chunks]
+
+    def _overlap(self, sentences, next_tokens):
+        """Trailing sentences to repeat, leaving room for the next sentence."""
+        budget = min(self.overlap_tokens, self.max_tokens - next_tokens - 1)
+        kept = []
+        for sentence in reversed(sentences):
+            if _size(kept + [sentence]) > budget:
+                break
+            kept.insert(0, sentence)
+        return kept
+
+    def split_documents(self, docs):
+        return [
+            Document(page_content=text, metadata=dict(doc.metadata))
+            for doc in docs
+            for text in self.split_text(doc.page_content)
+        ]
+
+
+def chunk_digest(text):
+    """Whitespace- and case-insensitive digest used to spot duplicate chunks."""
+    return hashlib.md5(" ".join(text.split()).lower().encode("utf-8")).hexdigest()
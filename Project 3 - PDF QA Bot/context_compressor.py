@@ -0,0 +1,92 @@
+from typing import Any, List
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from chunker import split_sentences, count_tokens
+
+CONTEXT_TOKEN_BUDGET = 600  # prompt tokens left for retrieved context after compression
+
+
+def compress_documents(query_vector, docs, embeddings, budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Keep the sentences of docs most similar to the query, best first, until
+    the token budget is used up. Kept sentences stay in their original order
+    and documents with none left are dropped. Returned documents record
+    their own tokens_after and the whole context's context_tokens_before.
+    """
+    sentences = []  # (doc index, sentence, tokens)
+    for i, doc in enumerate(docs):
+        sentences.extend((i, s, count_tokens(s)) for s in split_sentences(doc.page_content))
+    if not sentences:
+        return list(docs)
+
+    # Sentence vectors come through the embedding cache, so repeated chunks are free
+    matrix = np.asarray(embeddings.embed_documents([s for _, s, _ in sentences]), dtype=np.float32)
+    query = np.asarray(query_vector, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+    similarities = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+
+    kept = set()
+    used = 0
+    for j in np.argsort(-similarities):
+        n = sentences[j][2]
+        if kept and used + n > budget:
+            continue
+        kept.add(int(j))
+        used += n
+
+    by_doc = {}
+    for j, (i, sentence, n) in enumerate(sentences):
+        if j in kept:
+            by_doc.setdefault(i, []).append((sentence, n))
+
+    tokens_before = sum(n for _, _, n in sentences)
+    compressed = []
+    for i, doc in enumerate(docs):
+        if i not in by_doc:
+            continue
+        compressed.append(Document(
+            page_content=" ".join(sentence for sentence, _ in by_doc[i]),
+            metadata={
+                **doc.metadata,
+                "context_tokens_before": tokens_before,
+                "tokens_after": sum(n for _, n in by_doc[i]),
+            }
+        ))
+    return compressed
+
+
+def compression_stats(docs):
+    """Context tokens before and after compression for one question's sources, or None."""
+    if not docs or "context_tokens_before" not in docs[0].metadata:
+        return None
+    before = docs[0].metadata["context_tokens_before"]
+    after = sum(doc.metadata["tokens_after"] for doc in docs)
+    return {"tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
+
+
+def is_keyword_only(retriever, query):
+    """True if the innermost retriever answers query without embeddings (BM25 identifier lookup)."""
+    while retriever is not None:
+        if hasattr(retriever, "is_keyword_only"):
+            return retriever.is_keyword_only(query)
+        retriever = getattr(retriever, "base_retriever", None)
+    return False
+
+
+class CompressingRetriever(BaseRetriever):
+    """
+    Trim base_retriever's documents to the sentences relevant to the query.
+    Identifier lookups answered by BM25 alone are passed through whole, so
+    they still need no embedding call.
+    """
+
+    base_retriever: Any
+    embeddings: Any
+    budget: int = CONTEXT_TOKEN_BUDGET
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        docs = self.base_retriever.invoke(query)
+        if is_keyword_only(self.base_retriever, query):
+            return docs
+        return compress_documents(self.embeddings.embed_query(query), docs, self.embeddings, self.budget)
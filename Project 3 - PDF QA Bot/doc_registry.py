@@ -0,0 +1,243 @@
+import os
+import re
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from fingerprint import hash_file, load_manifest
+
+REGISTRY_PATH = os.path.join("store", "registry.sqlite")
+DOCS_DIR = "docs"
+STORE_DIR = "store"
+# Unreferenced documents are kept this long before GC, so a quick re-upload is free
+GC_GRACE_SECONDS = int(os.environ.get("QA_GC_GRACE_SECONDS", str(24 * 3600)))
+# A long-running server collects at most this often
+GC_INTERVAL_SECONDS = int(os.environ.get("QA_GC_INTERVAL_SECONDS", "3600"))
+DEFAULT_COLLECTION = "default"
+MD5_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def content_hash(data):
+    """MD5 of the uploaded bytes; the same digest fingerprint.hash_file computes."""
+    return hashlib.md5(data).hexdigest()
+
+
+class DocRegistry:
+    """
+    Maps (namespace, collection) → documents keyed by content hash. Each
+    distinct PDF is stored once as docs/<hash>.pdf with its index in
+    store/<hash>/, however many users or collections reference it. The
+    reference count of a document is its number of rows in refs; documents
+    with no references are removed by gc() after a grace period. Uploading
+    a changed file under the same name replaces the previous version in the
+    collection, and its index starts as a copy of that version's, so only
+    changed chunks are embedded.
+    """
+
+    def __init__(self, path=REGISTRY_PATH, docs_dir=DOCS_DIR, store_dir=STORE_DIR):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        os.makedirs(docs_dir, exist_ok=True)
+        self.docs_dir = docs_dir
+        self.store_dir = store_dir
+        self.last_gc = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " hash TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " released REAL)"  # when the last reference went away
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            " namespace TEXT NOT NULL,"
+            " collection TEXT NOT NULL,"
+            " hash TEXT NOT NULL REFERENCES documents (hash),"
+            " filename TEXT NOT NULL,"
+            " added REAL NOT NULL,"
+            " PRIMARY KEY (namespace, collection, hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_refs_hash ON refs (hash)")
+        self._conn.commit()
+
+    def pdf_path(self, doc_hash):
+        return os.path.join(self.docs_dir, f"{doc_hash}.pdf")
+
+    def store_path(self, doc_hash):
+        return os.path.join(self.store_dir, doc_hash)
+
+    def _seed_store(self, doc_hash, previous_hash):
+        """Start a new version's index as a copy of the previous version's, if it has none yet."""
+        target = self.store_path(doc_hash)
+        source = self.store_path(previous_hash)
+        if os.path.exists(target) or not os.path.exists(os.path.join(source, "index.faiss")):
+            return
+        tmp_path = f"{target}.{threading.get_ident()}.tmp"
+        shutil.copytree(source, tmp_path, ignore=shutil.ignore_patterns("checkpoints"))
+        os.replace(tmp_path, target)
+
+    def add(self, namespace, collection, filename, data):
+        """
+        Register an upload in a collection; the bytes are written only if new.
+        A different file already registered under the same filename is
+        replaced. Returns its hash.
+        """
+        doc_hash = content_hash(data)
+        pdf_path = self.pdf_path(doc_hash)
+        now = time.time()
+
+        with self._lock:
+            if not os.path.exists(pdf_path):
+                tmp_path = f"{pdf_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, pdf_path)
+
+            previous = [row[0] for row in self._conn.execute(
+                "SELECT hash FROM refs WHERE namespace = ? AND collection = ? AND filename = ? AND hash != ?"
+                " ORDER BY added",
+                (namespace, collection, filename, doc_hash)
+            )]
+            if previous:
+                self._seed_store(doc_hash, previous[-1])
+
+            self._conn.execute(
+                "INSERT INTO documents (hash, size, created) VALUES (?, ?, ?)"
+                " ON CONFLICT (hash) DO UPDATE SET released = NULL",
+                (doc_hash, len(data), now)
+            )
+            self._conn.execute(
+                "INSERT INTO refs (namespace, collection, hash, filename, added) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (namespace, collection, hash) DO UPDATE SET filename = excluded.filename",
+                (namespace, collection, doc_hash, filename, now)
+            )
+            for previous_hash in previous:
+                self._release(namespace, collection, previous_hash)
+            self._conn.commit()
+        return doc_hash
+
+    def _release(self, namespace, collection, doc_hash):
+        self._conn.execute(
+            "DELETE FROM refs WHERE namespace = ? AND collection = ? AND hash = ?",
+            (namespace, collection, doc_hash)
+        )
+        self._conn.execute(
+            "UPDATE documents SET released = ? WHERE hash = ?"
+            " AND NOT EXISTS (SELECT 1 FROM refs WHERE refs.hash = documents.hash)",
+            (time.time(), doc_hash)
+        )
+
+    def remove(self, namespace, collection, doc_hash):
+        """Drop one reference; the document is released once nothing references it."""
+        with self._lock:
+            self._release(namespace, collection, doc_hash)
+            self._conn.commit()
+
+    def list_documents(self, namespace, collection):
+        """[(hash, filename)] in upload order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT hash, filename FROM refs WHERE namespace = ? AND collection = ? ORDER BY added",
+                (namespace, collection)
+            ).fetchall()
+
+    def list_collections(self, namespace):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT collection FROM refs WHERE namespace = ? ORDER BY collection",
+                (namespace,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def refcount(self, doc_hash):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM refs WHERE hash = ?", (doc_hash,)).fetchone()[0]
+
+    def adopt_legacy_stores(self):
+        """
+        Move indexes from the old name-keyed store/<name>/ folders to
+        store/<hash>/, and their PDF from docs/<name>.pdf to docs/<hash>.pdf
+        when it still matches. They are registered as released: an upload of
+        the same file within the GC grace period reuses the index, and gc()
+        removes it otherwise. Returns the adopted hashes.
+        """
+        adopted = []
+        with self._lock:
+            for name in sorted(os.listdir(self.store_dir)):
+                folder_path = os.path.join(self.store_dir, name)
+                hash_path = os.path.join(folder_path, "file_hash.txt")
+                if MD5_RE.fullmatch(name) or not os.path.exists(hash_path):
+                    continue
+                with open(hash_path, "r") as f:
+                    doc_hash = f.read().strip()
+                if os.path.exists(self.store_path(doc_hash)):
+                    print(f"Skipping {folder_path}: {self.store_path(doc_hash)} already holds that document")
+                    continue
+
+                size = 0
+                source = load_manifest(folder_path).get("source")
+                legacy_pdf = os.path.join(self.docs_dir, source) if source else None
+                if legacy_pdf and os.path.exists(legacy_pdf) and hash_file(legacy_pdf) == doc_hash:
+                    size = os.path.getsize(legacy_pdf)
+                    os.replace(legacy_pdf, self.pdf_path(doc_hash))
+                os.replace(folder_path, self.store_path(doc_hash))
+
+                self._conn.execute(
+                    "INSERT INTO documents (hash, size, created, released) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (hash) DO NOTHING",
+                    (doc_hash, size, time.time(), time.time())
+                )
+                adopted.append(doc_hash)
+            self._conn.commit()
+        return adopted
+
+    def maybe_gc(self, interval=GC_INTERVAL_SECONDS):
+        """Run gc() if it has not run in the last interval seconds."""
+        with self._lock:
+            if time.time() - self.last_gc < interval:
+                return []
+            self.last_gc = time.time()
+        return self.gc()
+
+    def gc(self, grace_seconds=GC_GRACE_SECONDS):
+        """Delete the PDF and index of documents unreferenced for longer than the grace period."""
+        with self._lock:
+            self.last_gc = time.time()
+            rows = self._conn.execute(
+                "SELECT hash, size FROM documents WHERE released IS NOT NULL AND released < ?"
+                " AND NOT EXISTS (SELECT 1 FROM refs WHERE refs.hash = documents.hash)",
+                (time.time() - grace_seconds,)
+            ).fetchall()
+
+            for doc_hash, _ in rows:
+                if os.path.exists(self.pdf_path(doc_hash)):
+                    os.remove(self.pdf_path(doc_hash))
+                shutil.rmtree(self.store_path(doc_hash), ignore_errors=True)
+                self._conn.execute("DELETE FROM documents WHERE hash = ?", (doc_hash,))
+            self._conn.commit()
+
+        if rows:
+            print(f"GC removed {len(rows)} unreferenced document(s), {sum(size for _, size in rows) / 1e6:.1f} MB of PDFs")
+        return [doc_hash for doc_hash, _ in rows]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    One registry per process, shared by every session. Called on every
+    rerun, so released documents are collected at most every
+    GC_INTERVAL_SECONDS while the server keeps running.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DocRegistry()
+            _registry.adopt_legacy_stores()
+    _registry.maybe_gc()
+    return _registry
@@ -1,58 +1,169 @@
 import os
+import sys
 import hashlib
 from langchain.vectorstores import FAISS
 from langchain.embeddings.openai import OpenAIEmbeddings
+from fingerprint import get_fingerprint, record_fingerprint, load_manifest
+from chunker import SPLITTER_SETTINGS
+from store_format import load_store, save_store
+from bm25_index import build_keyword_index, load_keyword_index
 
-def get_file_hash(pdf_path):
-    """Get MD5 hash of the file to detect changes."""
-    hasher = hashlib.md5()
-    with open(pdf_path, 'rb') as f:
-        buf = f.read()
-        hasher.update(buf)
-    return hasher.hexdigest()
+# Shared embedding cache lives at the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embedding_cache import CachedEmbeddings
+from common.index_builder import iter_embedded_batches, clear_checkpoints
+from common.index_factory import convert_store_index, tune_index, is_flat_index
 
-def create_or_load_vector_store(docs, folder_path, pdf_path):
-    """Create or load FAISS vector store for a given PDF."""
+INGEST_BATCH_SIZE = 64  # chunks per embedding batch
+INGEST_WINDOW = 4       # embedding batches in flight at once
 
-    if not docs or len(docs) == 0:
-        raise ValueError("No documents found after PDF split. Please check the PDF content.")
+def get_embeddings():
+    """OpenAI embeddings backed by the shared on-disk embedding cache."""
+    return CachedEmbeddings(OpenAIEmbeddings())
+
+def iter_chunk_ids(docs):
+    """
+    Yield (id, chunk) with stable docstore ids from page number + chunk text,
+    so an unchanged chunk keeps the same id across re-indexing. Repeated
+    chunks on the same page get an occurrence suffix to stay unique.
+    """
+    seen = {}
+    for doc in docs:
+        page = doc.metadata.get("page", "")
+        digest = hashlib.md5(f"{page}\x00{doc.page_content}".encode("utf-8")).hexdigest()
+        count = seen.get(digest, 0)
+        seen[digest] = count + 1
+        yield f"{digest}-{count}", doc
+
+def ingest_chunks(chunks, vector_store=None, checkpoint_dir=None, progress=None,
+                  batch_size=INGEST_BATCH_SIZE, window=INGEST_WINDOW):
+    """
+    Stream chunks into a FAISS store: page → chunk → embed batch → add to index.
+    Chunks whose id is already in vector_store are reused without embedding;
+    their docstore entry is rewritten so metadata such as the source path
+    follows the new file (a store seeded from a previous version). Only
+    `window` batches are held in memory at a time, so chunks may be a lazy
+    generator over a very large PDF. Returns (vector_store, seen ids, embedded count).
+    """
+    embeddings = get_embeddings()
+    existing_ids = set(vector_store.index_to_docstore_id.values()) if vector_store else set()
+    seen_ids = set()
+    seen_pages = set()
+
+    def new_batches():
+        batch = []
+        reused = {}
+        for doc_id, doc in iter_chunk_ids(chunks):
+            seen_ids.add(doc_id)
+            seen_pages.add(doc.metadata.get("page"))
+            if doc_id in existing_ids:
+                reused[doc_id] = doc
+                if len(reused) >= batch_size:
+                    vector_store.docstore.add(reused)
+                    reused = {}
+                continue
+            batch.append((doc_id, doc))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if reused:
+            vector_store.docstore.add(reused)
+        if batch:
+            yield batch
+
+    embedded = 0
+    for batch, vectors in iter_embedded_batches(
+        new_batches(), embeddings, window=window, checkpoint_dir=checkpoint_dir,
+        get_text=lambda item: item[1].page_content
+    ):
+        text_embeddings = [(doc.page_content, vector) for (_, doc), vector in zip(batch, vectors)]
+        metadatas = [doc.metadata for _, doc in batch]
+        ids = [doc_id for doc_id, _ in batch]
+
+        if vector_store is None:
+            vector_store = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+        else:
+            vector_store.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+
+        embedded += len(batch)
+        if progress:
+            progress(len(seen_pages))
+
+    return vector_store, seen_ids, embedded
+
+def read_saved_hash(folder_path):
+    """Hash of the PDF the store in folder_path was last built from, if any."""
+    try:
+        with open(os.path.join(folder_path, "file_hash.txt"), "r") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def is_store_current(folder_path, file_hash):
+    """
+    True when the saved index was built from exactly this file with the
+    current splitter settings; older stores are re-chunked on next use.
+    """
+    return (
+        read_saved_hash(folder_path) == file_hash
+        and load_manifest(folder_path).get("splitter") == list(SPLITTER_SETTINGS)
+        and os.path.exists(os.path.join(folder_path, "index.faiss"))
+    )
+
+def create_or_load_vector_store(docs, folder_path, pdf_path, progress=None):
+    """
+    Create or load FAISS vector store for a given PDF. docs may be a list or a
+    lazy iterable of chunks; it is only consumed when the store needs building.
+    """
 
     # Ensure store folder exists
     os.makedirs(folder_path, exist_ok=True)
 
-    # Check if vectorstore already exists
-    if os.path.exists(folder_path):
-        saved_hash = None
-        try:
-            with open(os.path.join(folder_path, "file_hash.txt"), "r") as f:
-                saved_hash = f.read().strip()
-        except FileNotFoundError:
-            pass
-
-        current_hash = get_file_hash(pdf_path)
-
-        if saved_hash != current_hash:
-            # If hash mismatch → recreate vector store
-            embeddings = OpenAIEmbeddings()
-            vector_store = FAISS.from_documents(docs, embeddings)
-            vector_store.save_local(folder_path)
-
-            with open(os.path.join(folder_path, "file_hash.txt"), "w") as f:
-                f.write(current_hash)
-        else:
-            # If hash same → load existing vector store
-            vector_store = FAISS.load_local(
-                folder_path,
-                OpenAIEmbeddings(),
-                allow_dangerous_deserialization=True
-            )
+    # Size + mtime fast path avoids rehashing unchanged files
+    current_hash = get_fingerprint(pdf_path, folder_path)
+    checkpoint_dir = os.path.join(folder_path, "checkpoints")
+    index_exists = os.path.exists(os.path.join(folder_path, "index.faiss"))
+
+    if is_store_current(folder_path, current_hash):
+        # If hash same → memory-map the existing vector store
+        vector_store = load_store(folder_path, get_embeddings())
+        tune_index(vector_store.index)
+        vector_store.keyword_index = load_keyword_index(vector_store, folder_path)
     else:
-        # If no folder exists → create new vector store
-        embeddings = OpenAIEmbeddings()
-        vector_store = FAISS.from_documents(docs, embeddings)
-        vector_store.save_local(folder_path)
+        # If hash mismatch → reuse unchanged chunk vectors, embed only the rest
+        vector_store = None
+        if index_exists:
+            vector_store = load_store(folder_path, get_embeddings(), mmap=False)
+            if not is_flat_index(vector_store.index):
+                # ANN indexes cannot drop vectors in place; rebuild, with unchanged
+                # chunks served from the embedding cache instead of the API
+                vector_store = None
+        existing_ids = set(vector_store.index_to_docstore_id.values()) if vector_store else set()
+
+        vector_store, seen_ids, embedded = ingest_chunks(
+            docs, vector_store, checkpoint_dir=checkpoint_dir, progress=progress
+        )
+        if not seen_ids:
+            raise ValueError("No documents found after PDF split. Please check the PDF content.")
+
+        # Drop chunks that no longer exist in the PDF
+        stale_ids = list(existing_ids - seen_ids)
+        if stale_ids:
+            vector_store.delete(stale_ids)
+
+        print(f"Indexed {pdf_path}: {embedded} embedded, {len(stale_ids)} removed, "
+              f"{len(seen_ids) - embedded} reused")
+
+        # Switch to the configured ANN index (IVF / HNSW / PQ) for large stores
+        vector_store = convert_store_index(vector_store)
+
+        save_store(vector_store, folder_path)
+        clear_checkpoints(checkpoint_dir)
+
+        # BM25 index for exact identifiers, saved next to index.faiss
+        vector_store.keyword_index = build_keyword_index(vector_store)
+        vector_store.keyword_index.save(folder_path)
 
-        with open(os.path.join(folder_path, "file_hash.txt"), "w") as f:
-            f.write(get_file_hash(pdf_path))
+    record_fingerprint(pdf_path, folder_path, current_hash, SPLITTER_SETTINGS)
 
     return vector_store
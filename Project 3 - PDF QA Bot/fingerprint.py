@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+
+# Streamed file hashing is shared with the P1 RAG scripts
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.file_hash import hash_file
+
+MANIFEST_NAME = "manifest.json"
+
+
+def load_manifest(folder_path):
+    """Read the fingerprint manifest stored next to file_hash.txt, if any."""
+    try:
+        with open(os.path.join(folder_path, MANIFEST_NAME), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(folder_path, manifest):
+    """Write the fingerprint manifest atomically."""
+    os.makedirs(folder_path, exist_ok=True)
+    path = os.path.join(folder_path, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def get_fingerprint(pdf_path, folder_path):
+    """
+    Return the MD5 fingerprint of pdf_path, reusing the hash recorded in the
+    store manifest when the file size and mtime have not changed.
+    """
+    stat = os.stat(pdf_path)
+    manifest = load_manifest(folder_path)
+
+    # Fast path: same size and mtime → trust the recorded hash
+    if (
+        manifest.get("size") == stat.st_size
+        and manifest.get("mtime_ns") == stat.st_mtime_ns
+        and manifest.get("hash")
+    ):
+        return manifest["hash"]
+
+    return hash_file(pdf_path)
+
+
+def record_fingerprint(pdf_path, folder_path, file_hash, splitter=None):
+    """
+    Store size + mtime + hash for pdf_path in the manifest and file_hash.txt,
+    plus the splitter settings the store was chunked with, if given.
+    Files are only rewritten when something changed, so loading an
+    unchanged store does not touch the disk.
+    """
+    stat = os.stat(pdf_path)
+    manifest = load_manifest(folder_path)
+    entry = {
+        "source": os.path.basename(pdf_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": file_hash,
+    }
+    if splitter is not None:
+        entry["splitter"] = list(splitter)
+    if any(manifest.get(field) != value for field, value in entry.items()):
+        manifest.update(entry)
+        save_manifest(folder_path, manifest)
+
+    hash_path = os.path.join(folder_path, "file_hash.txt")
+    try:
+        with open(hash_path, "r") as f:
+            if f.read().strip() == file_hash:
+                return
+    except FileNotFoundError:
+        pass
+    with open(hash_path, "w") as f:
+        f.write(file_hash)
@@ -0,0 +1,205 @@
+import os
+import time
+import threading
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pdf_loader import iter_pdf_chunks, count_pages, SPLITTER_SETTINGS
+from embedder import create_or_load_vector_store, is_store_current
+from fingerprint import get_fingerprint
+
+EMBED_WORKERS = 4
+PARSE_WINDOW = 64          # chunks per message from a parse worker
+PARSE_QUEUE_WINDOWS = 4    # windows buffered per file before the parser waits
+PROGRESS_INTERVAL = 0.5    # seconds between status refreshes while embedding
+
+# Sessions sharing a document must not build its store at the same time
+_store_locks = defaultdict(threading.Lock)
+_store_locks_guard = threading.Lock()
+
+
+def _store_lock(store_path):
+    with _store_locks_guard:
+        return _store_locks[os.path.abspath(store_path)]
+
+
+class IngestJob:
+    """Status of one uploaded PDF as it moves through the scheduler."""
+
+    def __init__(self, pdf_path, store_path, name=None):
+        self.pdf_path = pdf_path
+        self.store_path = store_path
+        self.name = name or os.path.basename(pdf_path)
+        self.file_hash = None
+        self.status = "queued"
+        self.vectorstore = None
+        self.error = None
+        self.pages_done = 0
+        self.pages_total = None
+        self.started = time.perf_counter()
+
+
+def _parse_pdf(pdf_path, ocr_workers, queue):
+    """
+    CPU-bound stage, run in a worker process: parse, OCR and split one PDF,
+    sending chunks to the embed stage in windows of PARSE_WINDOW. The queue
+    is bounded, so the worker never holds more than a few windows.
+    """
+    stats = {}
+    window = []
+    for chunk in iter_pdf_chunks(pdf_path, ocr_workers=ocr_workers, stats=stats):
+        window.append(chunk)
+        if len(window) >= PARSE_WINDOW:
+            queue.put(("chunks", window))
+            window = []
+    if window:
+        queue.put(("chunks", window))
+    queue.put(("done", None))
+    print(
+        f"{os.path.basename(pdf_path)}: {stats['chunks']} chunks from {stats['pages']} pages, "
+        f"{stats['boilerplate_lines']} header/footer lines stripped, "
+        f"{stats['duplicates']} duplicate chunks dropped"
+    )
+
+
+class ChunkStream:
+    """The embed stage's side of a parse worker's queue, as a lazy chunk iterable."""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.finished = False
+
+    def __iter__(self):
+        while not self.finished:
+            kind, payload = self.queue.get()
+            if kind == "chunks":
+                yield from payload
+                continue
+            self.finished = True
+            if kind == "error":
+                raise RuntimeError(payload)
+
+    def drain(self):
+        """Consume what is left, so a parser blocked on a full queue can exit."""
+        while not self.finished:
+            kind, _ = self.queue.get()
+            self.finished = kind != "chunks"
+
+
+def _load_store(job):
+    """I/O-bound stage for unchanged files: just load the saved index."""
+    with _store_lock(job.store_path):
+        return create_or_load_vector_store([], job.store_path, job.pdf_path)
+
+
+def _embed_store(job, stream):
+    """I/O-bound stage: embed chunks as the parse worker sends them and save the index."""
+    def progress(pages_done):
+        job.pages_done = pages_done
+        if job.status == "parsing":
+            job.status = "embedding"
+
+    try:
+        with _store_lock(job.store_path):
+            return create_or_load_vector_store(stream, job.store_path, job.pdf_path, progress=progress)
+    finally:
+        stream.drain()
+
+
+def ingest_files(files, cache, on_update=None, max_parse_workers=None, max_embed_workers=EMBED_WORKERS):
+    """
+    Ingest (pdf_path, store_path[, display name]) tuples concurrently. Parsing/OCR runs in a
+    process pool and embedding/loading in a thread pool. A file's chunks are
+    streamed from its parse worker to its embed thread in bounded windows, so
+    embedding starts with the first pages and the full chunk list is never
+    held. Files already in the resource cache or with an up-to-date saved
+    index skip parsing entirely. on_update(jobs) is called from the calling
+    thread after every state change and while pages are being embedded.
+    """
+    jobs = [IngestJob(*item) for item in files]
+    cpu_count = os.cpu_count() or 1
+    parse_workers = max_parse_workers or max(1, min(len(jobs), cpu_count))
+    # Split the cores between parallel files so per-file OCR does not oversubscribe
+    ocr_workers = max(1, cpu_count // parse_workers)
+
+    def notify():
+        if on_update:
+            on_update(jobs)
+
+    parse_pool = None
+    manager = None
+    embed_pool = ThreadPoolExecutor(max_workers=max_embed_workers)
+    pending = {}
+    queues = {}
+
+    def submit(job):
+        """Look up, load or start building one file's store."""
+        nonlocal parse_pool, manager
+        job.file_hash = get_fingerprint(job.pdf_path, job.store_path)
+        key = ("store", job.file_hash, SPLITTER_SETTINGS)
+
+        cached = cache.get(key)
+        if cached is not None:
+            job.vectorstore = cached
+            job.status = "cached"
+        elif is_store_current(job.store_path, job.file_hash):
+            job.status = "loading"
+            pending[embed_pool.submit(_load_store, job)] = (job, "load")
+        else:
+            if parse_pool is None:
+                # spawn: forking a threaded Streamlit server is not safe
+                context = multiprocessing.get_context("spawn")
+                parse_pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=context)
+                manager = context.Manager()
+            job.status = "parsing"
+            job.pages_total = count_pages(job.pdf_path)
+            queues[job] = queue = manager.Queue(maxsize=PARSE_QUEUE_WINDOWS)
+            # Both pools run jobs in submission order, so the oldest running
+            # parser always has an embed thread draining its queue
+            pending[parse_pool.submit(_parse_pdf, job.pdf_path, ocr_workers, queue)] = (job, "parse")
+            pending[embed_pool.submit(_embed_store, job, ChunkStream(queue))] = (job, "embed")
+
+    try:
+        for job in jobs:
+            try:
+                submit(job)
+            except Exception as exc:
+                # One unreadable PDF must not stop the rest of the collection
+                job.status = "failed"
+                job.error = str(exc)
+        notify()
+
+        while pending:
+            done, _ = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, stage = pending.pop(future)
+                cache.record(stage, time.perf_counter() - job.started)
+                job.started = time.perf_counter()
+
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    job.status = "failed"
+                    job.error = job.error or str(exc)
+                    if stage == "parse":
+                        # Unblock the file's embed thread instead of building a partial index
+                        queues[job].put(("error", job.error))
+                    continue
+
+                if stage == "parse":
+                    # The embed thread may still be adding the last windows
+                    if job.status == "parsing":
+                        job.status = "embedding"
+                else:
+                    job.vectorstore = result
+                    job.status = "ready"
+                    cache.put(("store", job.file_hash, SPLITTER_SETTINGS), result)
+            # Also refreshes page progress while nothing finished
+            notify()
+    finally:
+        embed_pool.shutdown(wait=False, cancel_futures=True)
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+            manager.shutdown()
+
+    return jobs
@@ -1,11 +1,20 @@
 import os
 import json
 import sys
+import time
+import uuid
 import subprocess
 import streamlit as st
-from pdf_loader import load_and_split_pdf
-from embedder import create_or_load_vector_store
-from qa_engine import create_qa_chain
+from pdf_loader import SPLITTER_SETTINGS
+from embedder import get_embeddings
+from ingest_scheduler import ingest_files
+from retriever import MultiIndexStore
+from resource_cache import get_resource_cache
+from qa_engine import create_qa_chain, stream_question, RERANK
+from reranker import get_reranker
+from context_compressor import compression_stats
+from answer_cache import get_answer_cache, doc_set_fingerprint
+from doc_registry import get_registry, DEFAULT_COLLECTION
 from utils import export_to_pdf, export_to_text
 from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings  # Correct import
@@ -30,47 +39,182 @@ os.environ["OPENAI_API_KEY"] = key_data["openai_api_key"]
 os.makedirs("docs", exist_ok=True)
 os.makedirs("store", exist_ok=True)
 
+STATUS_ICONS = {
+    "queued": "⏳", "parsing": "📖", "embedding": "🧠", "loading": "💾",
+    "cached": "⚡", "ready": "✅", "failed": "❌",
+}
+
+def render_ingest_status(placeholder, jobs):
+    """Live per-file status table for the ingestion scheduler."""
+    rows = ["| File | Status |", "|---|---|"]
+    for job in jobs:
+        status = f"{STATUS_ICONS.get(job.status, '')} {job.status}"
+        if job.status in ("parsing", "embedding") and job.pages_total:
+            status += f" ({job.pages_done}/{job.pages_total} pages)"
+        if job.error:
+            status += f": {job.error}"
+        rows.append(f"| {job.name} | {status} |")
+    placeholder.markdown("\n".join(rows))
+
+def show_cache_metrics(cache):
+    """Sidebar panel with cache hit rates and per-stage latency."""
+    stats = cache.stats()
+    with st.sidebar.expander("⚡ Cache metrics"):
+        st.write(f"Entries: {stats['entries']} ({stats['memory_mb']:.1f} MB)")
+        for namespace, rate in sorted(stats["hit_rate"].items()):
+            st.write(f"{namespace} hit rate: {rate:.0%}")
+        for stage, ms in sorted(stats["latency_ms"].items()):
+            st.write(f"{stage}: {ms:.1f} ms")
+        st.write(f"answer cache hit rate: {get_answer_cache().stats()['hit_rate']:.0%}")
+        if RERANK:
+            st.write(f"rerank score cache hit rate: {get_reranker().stats()['hit_rate']:.0%}")
+        context = st.session_state.get("context_tokens")
+        if context and context["before"]:
+            saved = context["before"] - context["after"]
+            st.write(f"context tokens saved: {saved} ({saved / context['before']:.0%})")
+
+def select_collection(registry):
+    """Sidebar: the user's namespace and the collection to work in."""
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    namespace = st.sidebar.text_input("User", value=session_id[:8]).strip() or session_id[:8]
+    collection = st.sidebar.text_input("Collection", value=DEFAULT_COLLECTION).strip() or DEFAULT_COLLECTION
+
+    others = [name for name in registry.list_collections(namespace) if name != collection]
+    if others:
+        st.sidebar.caption("Your other collections: " + ", ".join(others))
+    return namespace, collection
+
+def show_collection(registry, namespace, collection, documents):
+    """Sidebar list of the collection's PDFs, with a remove button each."""
+    st.sidebar.write(f"### 📁 {collection} ({len(documents)} PDFs)")
+    for doc_hash, filename in documents:
+        col_name, col_remove = st.sidebar.columns([4, 1])
+        col_name.write(filename)
+        if col_remove.button("✖", key=f"remove-{doc_hash}", help="Remove from collection"):
+            registry.remove(namespace, collection, doc_hash)
+            st.rerun()
+
+def get_session_chain(doc_key, vector_store):
+    """
+    This session's QA chain for a document set, rebuilt only when the set
+    changes. Each set's memory is kept, so switching back resumes its conversation.
+    """
+    key = (doc_key, SPLITTER_SETTINGS)
+    current = st.session_state.get("qa_chain")
+    if current is not None and current[0] == key:
+        return current[1]
+
+    memories = st.session_state.setdefault("qa_memories", {})
+    qa_chain = create_qa_chain(vector_store, memory=memories.get(key))
+    memories[key] = qa_chain.memory
+    st.session_state.qa_chain = (key, qa_chain)
+    return qa_chain
+
 def main():
     st.title("📄 AI PDF Q&A Bot")
     st.write("Upload multiple PDFs, ask questions, and get answers.")
 
-    uploaded_files = st.file_uploader("Choose PDFs", type="pdf", accept_multiple_files=True)
-
-    if uploaded_files:
-        all_vectorstores = []
+    registry = get_registry()
+    namespace, collection = select_collection(registry)
 
-        for uploaded_file in uploaded_files:
-            pdf_path = os.path.join("docs", uploaded_file.name)
-            with open(pdf_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
+    uploaded_files = st.file_uploader("Choose PDFs", type="pdf", accept_multiple_files=True)
 
-            pdf_name = os.path.splitext(uploaded_file.name)[0]
-            store_path = os.path.join("store", pdf_name)
+    # Files are stored once by content hash; adding the same upload again only adds a reference
+    added_uploads = st.session_state.setdefault("added_uploads", set())
+    for uploaded_file in uploaded_files or []:
+        upload_key = (namespace, collection, uploaded_file.file_id)
+        if upload_key not in added_uploads:
+            registry.add(namespace, collection, uploaded_file.name, uploaded_file.getbuffer())
+            added_uploads.add(upload_key)
+
+    documents = registry.list_documents(namespace, collection)
+    show_collection(registry, namespace, collection, documents)
+
+    if documents:
+        cache = get_resource_cache()
+        files = [
+            (registry.pdf_path(doc_hash), registry.store_path(doc_hash), filename)
+            for doc_hash, filename in documents
+        ]
+        source_names = {pdf_path: filename for pdf_path, _, filename in files}
+
+        # Parse and embed all PDFs concurrently (cached across reruns and sessions)
+        status_placeholder = st.empty()
+        jobs = ingest_files(
+            files, cache,
+            on_update=lambda jobs: render_ingest_status(status_placeholder, jobs)
+        )
+
+        failed = [job for job in jobs if job.status == "failed"]
+        if failed:
+            render_ingest_status(status_placeholder, jobs)
+        else:
+            status_placeholder.empty()
 
-            docs = load_and_split_pdf(pdf_path)
+        ready = [job for job in jobs if job.vectorstore is not None]
+        if not ready:
+            st.error("None of the PDFs in this collection could be processed.")
+            return
 
-            # Create or load vectorstore for each PDF
-            vectorstore = create_or_load_vector_store(docs, store_path, pdf_path)
-            all_vectorstores.append(vectorstore)
+        all_vectorstores = [job.vectorstore for job in ready]
+        file_hashes = [job.file_hash for job in ready]
 
-        # Merge all vector stores into one
-        if len(all_vectorstores) == 1:
-            combined_vectorstore = all_vectorstores[0]
-        else:
-            combined_vectorstore = all_vectorstores[0]
-            for vectorstore in all_vectorstores[1:]:
-                combined_vectorstore.merge_from(vectorstore)
+        # Search all per-PDF stores at query time instead of merging them
+        combined_vectorstore = MultiIndexStore(all_vectorstores, get_embeddings())
 
-        # Create QA chain
-        qa_chain = create_qa_chain(combined_vectorstore)
+        # Chains hold this session's chat memory, so they live in session state rather
+        # than the shared LRU, where eviction would drop the conversation mid-session
+        qa_chain = get_session_chain(tuple(sorted(file_hashes)), combined_vectorstore)
 
         # Allow user to ask questions
         query = st.text_input("Ask your question:")
 
         if query:
-            response = qa_chain.run(query)
-            st.write("### Answer:")
-            st.write(response)
+            # Reruns (e.g. button clicks) must not re-ask the cached chain, or its memory repeats
+            answered = {conv['question']: conv['answer'] for conv in st.session_state.get('conversation', [])}
+            if query in answered:
+                response = answered[query]
+                st.write("### Answer:")
+                st.write(response)
+            else:
+                start = time.perf_counter()
+                sources, tokens, from_cache = stream_question(
+                    qa_chain, query, doc_set_fingerprint(file_hashes),
+                    get_answer_cache(), get_embeddings()
+                )
+
+                # Retrieved chunks are known before the first token arrives
+                if sources:
+                    with st.expander(f"📚 Sources ({len(sources)} chunks)"):
+                        for doc in sources:
+                            path = doc.metadata.get("source", "")
+                            source = source_names.get(path, os.path.basename(path))
+                            st.markdown(f"**{source}, page {doc.metadata.get('page', 0) + 1}**")
+                            st.caption(doc.page_content[:300])
+
+                compression = compression_stats(sources)
+                if compression:
+                    context = st.session_state.setdefault("context_tokens", {"before": 0, "after": 0})
+                    context["before"] += compression["tokens_before"]
+                    context["after"] += compression["tokens_after"]
+                    st.caption(
+                        f"✂️ Context: {compression['tokens_before']} → {compression['tokens_after']} tokens "
+                        f"({compression['tokens_saved']} saved)"
+                    )
+
+                def timed_tokens():
+                    first = True
+                    for token in tokens:
+                        if first:
+                            cache.record("first_token", time.perf_counter() - start)
+                            first = False
+                        yield token
+
+                st.write("### Answer:")
+                response = st.write_stream(timed_tokens())
+                cache.record("answer", time.perf_counter() - start)
+                if from_cache:
+                    st.caption("⚡ Answered from cache")
 
             # Store conversation in session state
             if 'conversation' not in st.session_state:
@@ -88,5 +232,7 @@ def main():
             if st.button("Export Q&A to Text"):
                 export_to_text(st.session_state.conversation)
 
+        show_cache_metrics(cache)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,53 @@
+"""
+Convert pickle-based FAISS stores (index.faiss + index.pkl) under store/ to
+the SQLite docstore format read by store_format.load_store, then move stores
+from the old name-keyed store/<name>/ folders to the registry's
+content-hash layout (store/<md5>/).
+
+Usage:
+    python migrate_store.py [store_dir]
+"""
+import os
+import sys
+import time
+from langchain_openai import OpenAIEmbeddings
+from langchain_community.vectorstores import FAISS
+from store_format import is_legacy_store, save_store, load_store
+from doc_registry import DocRegistry
+
+
+def migrate(store_dir):
+    migrated = 0
+    for name in sorted(os.listdir(store_dir)):
+        folder_path = os.path.join(store_dir, name)
+        if not os.path.isdir(folder_path) or not is_legacy_store(folder_path):
+            continue
+
+        # Embeddings are only needed to construct the store; nothing is embedded here
+        embeddings = OpenAIEmbeddings(api_key=os.environ.get("OPENAI_API_KEY", "unused"))
+        vector_store = FAISS.load_local(folder_path, embeddings, allow_dangerous_deserialization=True)
+        count = len(vector_store.index_to_docstore_id)
+        save_store(vector_store, folder_path)
+
+        # Verify the converted store reads back with the same number of chunks
+        start = time.perf_counter()
+        reloaded = load_store(folder_path, embeddings)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert len(reloaded.index_to_docstore_id) == count, f"chunk count mismatch in {folder_path}"
+
+        print(f"Migrated {name}: {count} chunks, new load {elapsed:.1f} ms")
+        migrated += 1
+
+    print(f"{migrated} store(s) migrated.")
+
+
+def adopt(store_dir):
+    registry = DocRegistry(os.path.join(store_dir, "registry.sqlite"), store_dir=store_dir)
+    adopted = registry.adopt_legacy_stores()
+    print(f"{len(adopted)} name-keyed store(s) moved to content-hash folders.")
+
+
+if __name__ == "__main__":
+    store_dir = sys.argv[1] if len(sys.argv) > 1 else "store"
+    migrate(store_dir)
+    adopt(store_dir)
@@ -0,0 +1,148 @@
+import os
+import json
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pytesseract
+from pdf2image import convert_from_path, pdfinfo_from_path
+from langchain_core.documents import Document
+from fingerprint import hash_file
+
+OCR_CACHE_DIR = os.path.join("store", "ocr_cache")
+OCR_DPI = 200
+PAGE_RANGE_SIZE = 4  # pages rasterized at once per worker
+
+
+def _init_worker():
+    # One Tesseract thread per process; the pool already uses every core
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def _page_text_path(cache_dir, page_hash):
+    return os.path.join(cache_dir, "pages", f"{page_hash}.txt")
+
+
+def _read_page_text(cache_dir, page_hash):
+    try:
+        with open(_page_text_path(cache_dir, page_hash), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_page_text(cache_dir, page_hash, text):
+    path = _page_text_path(cache_dir, page_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _ocr_page_range(pdf_path, first, last, dpi, cache_dir):
+    """Rasterize pages first..last (0-based, inclusive) and OCR each one not already cached."""
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=first + 1, last_page=last + 1)
+    results = []
+    for page, image in zip(range(first, last + 1), images):
+        page_hash = hashlib.md5(image.tobytes()).hexdigest()
+        text = _read_page_text(cache_dir, page_hash)
+        if text is None:
+            text = pytesseract.image_to_string(image)
+            _write_page_text(cache_dir, page_hash, text)
+        image.close()
+        results.append((page, page_hash, text))
+    return results
+
+
+def _load_page_map(cache_dir, file_key):
+    """Map of page number → page hash recorded the last time this exact file was OCR'd."""
+    try:
+        with open(os.path.join(cache_dir, "files", f"{file_key}.json"), "r") as f:
+            return {int(page): page_hash for page, page_hash in json.load(f).items()}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_page_map(cache_dir, file_key, page_map):
+    path = os.path.join(cache_dir, "files", f"{file_key}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(page_map, f)
+
+
+def _plan_units(pages, cached_pages, range_size):
+    """Group pages into cached single pages and contiguous OCR ranges, in page order."""
+    units = []
+    run = []
+    for page in pages:
+        if page in cached_pages:
+            if run:
+                units.append(("ocr", run))
+                run = []
+            units.append(("cached", [page]))
+            continue
+        if run and (page != run[-1] + 1 or len(run) >= range_size):
+            units.append(("ocr", run))
+            run = []
+        run.append(page)
+    if run:
+        units.append(("ocr", run))
+    return units
+
+
+def get_page_count(pdf_path):
+    return pdfinfo_from_path(pdf_path)["Pages"]
+
+
+def iter_ocr_pages(pdf_path, pages=None, dpi=OCR_DPI, range_size=PAGE_RANGE_SIZE,
+                   max_workers=None, cache_dir=OCR_CACHE_DIR):
+    """
+    Yield one Document per OCR'd page, in page order, while a process pool
+    rasterizes and OCRs small page ranges ahead. Page text is cached by page
+    image hash, and each file remembers its page hashes, so re-uploading the
+    same PDF never rasterizes or OCRs it again.
+    """
+    if pages is None:
+        pages = range(get_page_count(pdf_path))
+    pages = sorted(pages)
+
+    file_key = f"{hash_file(pdf_path)}_{dpi}"
+    page_map = _load_page_map(cache_dir, file_key)
+    cached_pages = {
+        page for page in pages
+        if page in page_map and os.path.exists(_page_text_path(cache_dir, page_map[page]))
+    }
+    units = _plan_units(pages, cached_pages, range_size)
+
+    def make_document(page, text):
+        return Document(page_content=text, metadata={"source": pdf_path, "page": page, "ocr": True})
+
+    max_workers = max_workers or os.cpu_count() or 1
+    window = max_workers * 2
+    ocr_queue = deque(run for kind, run in units if kind == "ocr")
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+        inflight = {}
+
+        def top_up():
+            # Keep a bounded number of page ranges rasterized ahead of the consumer
+            while ocr_queue and len(inflight) < window:
+                run = ocr_queue.popleft()
+                inflight[run[0]] = pool.submit(
+                    _ocr_page_range, pdf_path, run[0], run[-1], dpi, cache_dir
+                )
+
+        top_up()
+        for kind, run in units:
+            if kind == "cached":
+                page = run[0]
+                yield make_document(page, _read_page_text(cache_dir, page_map[page]))
+                continue
+
+            results = inflight.pop(run[0]).result()
+            top_up()
+            for page, page_hash, text in results:
+                page_map[page] = page_hash
+                yield make_document(page, text)
+
+    _save_page_map(cache_dir, file_key, page_map)
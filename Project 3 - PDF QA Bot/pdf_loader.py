@@ -1,45 +1,106 @@
+from itertools import chain, islice
 from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-import pytesseract
-from pdf2image import convert_from_path
+from pypdf import PdfReader
+from ocr import iter_ocr_pages, get_page_count
+from chunker import (
+    TokenChunker, CHUNK_TOKENS, OVERLAP_TOKENS, MIN_CHUNK_TOKENS, SPLITTER_SETTINGS,
+    find_boilerplate, strip_boilerplate, chunk_digest
+)
 import os
 
-def load_and_split_pdf(pdf_path):
-    """Load PDF and split it into chunks, using OCR if no extractable text is found."""
-    
-    # Attempt to extract text using PyPDFLoader
-    loader = PyPDFLoader(pdf_path)
-    documents = loader.load()
-
-    # If no text was extracted, try OCR on the PDF
-    if not documents:
-        print(f"No extractable text found in {pdf_path}. Attempting OCR.")
-        
-        # Convert PDF pages to images using pdf2image
-        images = convert_from_path(pdf_path)
-        
-        # Extract text from images using pytesseract
-        ocr_text = ""
-        for image in images:
-            ocr_text += pytesseract.image_to_string(image)
-        
-        # If OCR text is still empty, raise an error
-        if not ocr_text.strip():
-            raise ValueError(f"PDF contains no extractable text and OCR failed: {pdf_path}")
-        
-        # Create a document with the OCR text
-        documents = [{"page_content": ocr_text}]
-    
-    # Split the text into chunks
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=50,
-        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+# Pages with less extracted text than this are treated as scanned and OCR'd
+MIN_PAGE_CHARS = 20
+
+# Running headers/footers are detected on the first pages, then stripped from every page
+BOILERPLATE_SAMPLE_PAGES = 20
+
+def count_pages(pdf_path):
+    """Number of pages, read from the PDF structure without extracting text."""
+    return len(PdfReader(pdf_path).pages)
+
+def get_splitter():
+    return TokenChunker(
+        max_tokens=CHUNK_TOKENS,
+        overlap_tokens=OVERLAP_TOKENS,
+        min_tokens=MIN_CHUNK_TOKENS
     )
-    
-    docs = splitter.split_documents(documents)
-    
+
+def iter_pdf_pages(pdf_path, ocr_workers=None):
+    """
+    Yield one Document per page without holding the whole PDF in memory.
+    Pages with empty or near-empty extracted text are OCR'd after the text
+    pages, so only the page numbers of scanned pages are buffered.
+    """
+    sparse_pages = {}
+    extracted_any = False
+
+    for i, doc in enumerate(PyPDFLoader(pdf_path).lazy_load()):
+        extracted_any = True
+        if len(doc.page_content.strip()) < MIN_PAGE_CHARS:
+            sparse_pages[doc.metadata.get("page", i)] = doc
+            continue
+        yield doc
+
+    if not extracted_any:
+        # Nothing extracted at all → every page is a candidate
+        sparse_pages = dict.fromkeys(range(get_page_count(pdf_path)))
+
+    if not sparse_pages:
+        return
+
+    print(f"{len(sparse_pages)} page(s) in {pdf_path} have no extractable text. Attempting OCR.")
+    for ocr_doc in iter_ocr_pages(pdf_path, pages=list(sparse_pages), max_workers=ocr_workers):
+        doc = sparse_pages[ocr_doc.metadata["page"]]
+        if doc is None or len(ocr_doc.page_content.strip()) > len(doc.page_content.strip()):
+            doc = ocr_doc
+        if doc.page_content.strip():
+            yield doc
+
+def iter_pdf_chunks(pdf_path, ocr_workers=None, stats=None, splitter=None):
+    """
+    Lazily split a PDF page by page, for streaming ingestion. Running
+    headers/footers are stripped and chunks whose text was already yielded
+    are dropped, so they are never embedded. Counts go into stats if given.
+    splitter defaults to get_splitter(); benchmarks pass other sizes.
+    """
+    stats = {} if stats is None else stats
+    stats.update(pages=0, chunks=0, duplicates=0, boilerplate_lines=0)
+    splitter = splitter or get_splitter()
+    seen = set()
+
+    pages = iter_pdf_pages(pdf_path, ocr_workers=ocr_workers)
+    sample = list(islice(pages, BOILERPLATE_SAMPLE_PAGES))
+    boilerplate = find_boilerplate([page.page_content for page in sample])
+
+    for page in chain(sample, pages):
+        stats["pages"] += 1
+        text = strip_boilerplate(page.page_content, boilerplate)
+        stats["boilerplate_lines"] += page.page_content.count("\n") - text.count("\n")
+        page.page_content = text
+
+        for chunk in splitter.split_documents([page]):
+            digest = chunk_digest(chunk.page_content)
+            if digest in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(digest)
+            stats["chunks"] += 1
+            yield chunk
+
+def load_and_split_pdf(pdf_path, ocr_workers=None):
+    """Load PDF and split it into chunks, using OCR on pages with no extractable text."""
+
+    # OCR'd pages are streamed last; restore page order for the list API
+    stats = {}
+    docs = sorted(iter_pdf_chunks(pdf_path, ocr_workers=ocr_workers, stats=stats), key=lambda doc: doc.metadata.get("page", 0))
+    print(
+        f"{os.path.basename(pdf_path)}: {stats['chunks']} chunks from {stats['pages']} pages, "
+        f"{stats['boilerplate_lines']} header/footer lines stripped, "
+        f"{stats['duplicates']} duplicate chunks dropped ({stats['duplicates']} embedding calls saved)"
+    )
+
+    # If OCR text is still empty, raise an error
     if not docs:
-        raise ValueError(f"No chunks were created from the PDF: {pdf_path}")
-    
+        raise ValueError(f"PDF contains no extractable text and OCR failed: {pdf_path}")
+
     return docs
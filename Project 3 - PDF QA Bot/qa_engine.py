@@ -1,19 +1,143 @@
+import os
+import hashlib
 from langchain.chains import ConversationalRetrievalChain
 from langchain.llms import OpenAI
-from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import get_buffer_string
+from chat_memory import create_memory
+from reranker import RerankingRetriever, get_reranker, RERANK_FETCH_K, RERANK_TOP_N
+from context_compressor import CompressingRetriever, CONTEXT_TOKEN_BUDGET, is_keyword_only
 
-def create_qa_chain(vector_store):
-    """Create a Q&A chain using LangChain's conversational retriever"""
+# "hybrid" fuses BM25 keyword hits with vector hits (reciprocal rank fusion)
+SEARCH_TYPE = "hybrid"
+# "summary" keeps recent turns verbatim plus a running summary; "buffer" keeps everything
+MEMORY_MODE = "summary"
+# Retrieve RERANK_FETCH_K chunks and keep the RERANK_TOP_N best by a local cross-encoder
+RERANK = os.environ.get("QA_RERANK", "0") == "1"
+# Keep only the retrieved sentences closest to the question, within CONTEXT_TOKEN_BUDGET tokens.
+# Sentence embeddings go through the embedding cache, so repeated chunks cost nothing; QA_COMPRESS=0 disables it
+COMPRESS = os.environ.get("QA_COMPRESS", "1") == "1"
+
+def create_retriever(vector_store, search_type=SEARCH_TYPE, rerank=RERANK, compress=COMPRESS):
+    if rerank:
+        base = vector_store.as_retriever(
+            search_type=search_type,
+            search_kwargs={"k": RERANK_FETCH_K, "fetch_k": RERANK_FETCH_K}
+        )
+        retriever = RerankingRetriever(base_retriever=base, reranker=get_reranker(), top_n=RERANK_TOP_N)
+    else:
+        retriever = vector_store.as_retriever(search_type=search_type)
+
+    if compress:
+        retriever = CompressingRetriever(
+            base_retriever=retriever,
+            embeddings=vector_store.embeddings,
+            budget=CONTEXT_TOKEN_BUDGET
+        )
+    return retriever
+
+def create_qa_chain(vector_store, search_type=SEARCH_TYPE, memory_mode=MEMORY_MODE,
+                    rerank=RERANK, compress=COMPRESS, memory=None):
+    """
+    Create a Q&A chain using LangChain's conversational retriever. Pass an
+    existing memory to continue a conversation in a rebuilt chain.
+    """
     llm = OpenAI(temperature=0)
 
-    memory = ConversationBufferMemory(
-        memory_key="chat_history",
-        return_messages=True
-    )
+    if memory is None:
+        memory = create_memory(llm, mode=memory_mode)
 
     qa = ConversationalRetrievalChain.from_llm(
         llm,
-        retriever=vector_store.as_retriever(),
+        retriever=create_retriever(vector_store, search_type, rerank, compress),
         memory=memory
     )
     return qa
+
+def condense_question(qa_chain, query):
+    """The standalone question for query, rewritten with the chat history if there is any."""
+    history = qa_chain.memory.load_memory_variables({})["chat_history"]
+    if not history:
+        return query
+    return qa_chain.question_generator.predict(
+        question=query, chat_history=get_buffer_string(history)
+    )
+
+def stream_chain(qa_chain, query, question=None):
+    """
+    Run the chain's steps by hand so the final completion can stream:
+    condense the question, retrieve, then stream the answer from the LLM.
+    Returns (source documents, token generator); memory is updated once the
+    generator is exhausted. Pass question if query was already condensed.
+    """
+    if question is None:
+        question = condense_question(qa_chain, query)
+
+    sources = qa_chain.retriever.invoke(question)
+
+    llm_chain = qa_chain.combine_docs_chain.llm_chain
+    prompt = llm_chain.prompt.format(
+        context="\n\n".join(doc.page_content for doc in sources),
+        question=question
+    )
+
+    def tokens():
+        parts = []
+        for token in llm_chain.llm.stream(prompt):
+            parts.append(token)
+            yield token
+        qa_chain.memory.save_context({"question": query}, {"answer": "".join(parts)})
+
+    return sources, tokens()
+
+def retriever_settings(retriever):
+    """Settings of a (possibly wrapped) retriever that decide which context the LLM sees."""
+    settings = []
+    while retriever is not None:
+        fields = {
+            name: getattr(retriever, name)
+            for name in ("search_type", "search_kwargs", "k", "fetch_k", "hybrid", "top_n", "budget")
+            if hasattr(retriever, name)
+        }
+        settings.append((type(retriever).__name__, sorted(fields.items())))
+        retriever = getattr(retriever, "base_retriever", None)
+    return repr(settings)
+
+def answer_cache_key(qa_chain, doc_set):
+    """Answers are only reused for the same documents and the same retrieval pipeline."""
+    settings = retriever_settings(qa_chain.retriever)
+    return hashlib.md5(f"{doc_set}\n{settings}".encode("utf-8")).hexdigest()
+
+def stream_question(qa_chain, query, doc_set, answer_cache, embeddings):
+    """
+    Streaming answer with the semantic answer cache in front: a near-identical
+    question already answered for the same document set and retrieval
+    settings is returned at once. Follow-ups are condensed with the chat
+    history first, so "what about chapter 2?" is matched as the full question.
+    Identifier lookups answered by BM25 alone are cached on their exact text:
+    they need no embedding, and "E1234" must not match a cached "E1243".
+    Returns (source documents, token generator, from_cache).
+    """
+    question = condense_question(qa_chain, query)
+    cache_key = answer_cache_key(qa_chain, doc_set)
+    if is_keyword_only(qa_chain.retriever, question):
+        question_vector = None
+        answer = answer_cache.lookup_exact(cache_key, question)
+    else:
+        question_vector = embeddings.embed_query(question)
+        cached = answer_cache.lookup(cache_key, question_vector)
+        answer = cached[0] if cached is not None else None
+    if answer is not None:
+        # Keep the chain's history complete so follow-up questions still condense correctly
+        qa_chain.memory.save_context({"question": query}, {"answer": answer})
+        return [], iter([answer]), True
+
+    sources, tokens = stream_chain(qa_chain, query, question)
+
+    def caching_tokens():
+        parts = []
+        for token in tokens:
+            parts.append(token)
+            yield token
+        answer_cache.put(cache_key, question, question_vector, "".join(parts))
+
+    return sources, caching_tokens(), False
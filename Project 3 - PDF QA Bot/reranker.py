@@ -0,0 +1,111 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, List
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+RERANK_MODEL = os.environ.get("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_FETCH_K = 50   # candidates retrieved cheaply before re-ranking
+RERANK_TOP_N = 3      # chunks that reach the LLM prompt
+BATCH_SIZE = 16
+SCORE_CACHE_SIZE = 20000
+
+
+class CrossEncoderReranker:
+    """
+    Scores (query, chunk) pairs with a small local cross-encoder on CPU.
+    Only pairs missing from the LRU score cache are sent to the model,
+    in batches of batch_size.
+    """
+
+    def __init__(self, model_name=RERANK_MODEL, batch_size=BATCH_SIZE, cache_size=SCORE_CACHE_SIZE):
+        # Imported here so the app only loads torch when re-ranking is on
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:  # re-ranking is optional
+            raise ImportError("Re-ranking needs sentence-transformers: pip install sentence-transformers") from None
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(query, text):
+        return hashlib.md5(f"{query}\x00{text}".encode("utf-8")).hexdigest()
+
+    def score(self, query, texts):
+        keys = [self._key(query, text) for text in texts]
+        scores = {}
+        with self._lock:
+            for key in keys:
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    scores[key] = self._scores[key]
+            self.hits += len(scores)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in scores}
+        if missing:
+            predicted = self.model.predict(
+                [(query, text) for text in missing.values()],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+            with self._lock:
+                self.misses += len(missing)
+                for key, value in zip(missing, predicted):
+                    scores[key] = self._scores[key] = float(value)
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+
+        return [scores[key] for key in keys]
+
+    def rerank(self, query, docs, top_n=RERANK_TOP_N):
+        """Return the top_n documents by cross-encoder score, best first."""
+        if not docs:
+            return []
+        scores = self.score(query, [doc.page_content for doc in docs])
+        ranked = sorted(zip(scores, range(len(docs))), reverse=True)[:top_n]
+        return [
+            Document(page_content=docs[i].page_content, metadata={**docs[i].metadata, "rerank_score": score})
+            for score, i in ranked
+        ]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._scores),
+        }
+
+
+class RerankingRetriever(BaseRetriever):
+    """Fetch many candidates from base_retriever, keep the top_n after re-ranking."""
+
+    base_retriever: Any
+    reranker: Any
+    top_n: int = RERANK_TOP_N
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        candidates = self.base_retriever.invoke(query)
+        return self.reranker.rerank(query, candidates, self.top_n)
+
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker():
+    """Load the cross-encoder once per process; sessions share it and its score cache."""
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            _reranker = CrossEncoderReranker()
+        return _reranker
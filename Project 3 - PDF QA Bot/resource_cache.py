@@ -0,0 +1,107 @@
+import os
+import threading
+from collections import OrderedDict, Counter, defaultdict, deque
+
+DEFAULT_MAX_BYTES = int(os.environ.get("QA_CACHE_MAX_MB", "1024")) * 1024 * 1024
+SMALL_OBJECT_BYTES = 64 * 1024
+ID_MAP_ENTRY_BYTES = 150  # dict slot + int key + chunk id string
+POSTING_BYTES = 128       # [doc_pos, term_frequency] list in a BM25 posting list
+
+
+def estimate_size(value):
+    """Rough memory footprint of a loaded FAISS store."""
+    index = getattr(value, "index", None)
+    if index is None or not hasattr(index, "ntotal"):
+        return SMALL_OBJECT_BYTES
+
+    # Vector codes (d float32 for flat indexes, fewer bytes for PQ) plus the position → id map
+    size = index.ntotal * getattr(index, "code_size", index.d * 4)
+    size += ID_MAP_ENTRY_BYTES * len(getattr(value, "index_to_docstore_id", {}))
+
+    # SQLiteDocstore reads documents from disk on demand; only an in-memory docstore holds the text
+    documents = getattr(getattr(value, "docstore", None), "_dict", None)
+    if documents is not None:
+        size += sum(len(doc.page_content) for doc in documents.values())
+
+    keyword_index = getattr(value, "keyword_index", None)
+    if keyword_index is not None:
+        size += POSTING_BYTES * sum(len(postings) for postings in keyword_index.postings.values())
+    return size
+
+
+class ResourceCache:
+    """
+    Process-wide LRU cache for loaded vector stores.
+    Survives Streamlit reruns and is shared by every session in the process.
+    Per-session state such as QA chains and their chat memory is kept in
+    st.session_state instead, so eviction never drops a conversation.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        self.latencies = defaultdict(lambda: deque(maxlen=200))
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.RLock()
+
+    def record(self, stage, seconds):
+        """Record the wall time of a pipeline stage."""
+        with self._lock:
+            self.latencies[stage].append(seconds)
+
+    def get(self, key):
+        """Return the cached value for key (None on a miss), counting the lookup."""
+        namespace = key[0]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits[namespace] += 1
+                return self._entries[key][0]
+            self.misses[namespace] += 1
+            return None
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+
+            # Evict least recently used entries, but always keep the newest one
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def stats(self):
+        """Hit rate per namespace and mean latency per stage."""
+        with self._lock:
+            namespaces = set(self.hits) | set(self.misses)
+            hit_rate = {
+                ns: self.hits[ns] / (self.hits[ns] + self.misses[ns]) for ns in namespaces
+            }
+            latency_ms = {
+                stage: 1000 * sum(samples) / len(samples)
+                for stage, samples in self.latencies.items() if samples
+            }
+            return {
+                "entries": len(self._entries),
+                "memory_mb": self.total_bytes / (1024 * 1024),
+                "hit_rate": hit_rate,
+                "latency_ms": latency_ms,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_resource_cache():
+    """The module is imported once per process, so this instance outlives reruns."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResourceCache()
+        return _cache
@@ -0,0 +1,138 @@
+import heapq
+from itertools import islice
+from collections import defaultdict
+from typing import Any, List
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from bm25_index import IDENTIFIER_RE
+
+# FAISS releases the GIL during search, so threads give real parallelism
+_search_pool = ThreadPoolExecutor(max_workers=8)
+
+RRF_K = 60  # standard reciprocal rank fusion constant
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Fuse several ranked key lists: score(key) = Σ 1 / (k + rank)."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] += 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def _doc_key(store_pos, doc):
+    return store_pos, doc.metadata.get("page"), doc.page_content
+
+
+class MultiIndexRetriever(BaseRetriever):
+    """
+    Search several per-PDF FAISS stores in parallel and merge their top-k hits
+    by distance, instead of copying every store into one with merge_from.
+    In hybrid mode, BM25 keyword hits are fused with the vector hits using
+    reciprocal rank fusion.
+    """
+
+    vector_stores: List[Any]
+    embeddings: Any
+    k: int = 4
+    hybrid: bool = False
+    fetch_k: int = 20
+
+    def _vector_hits(self, query, k):
+        """(distance, store position, document) for the k closest chunks across all stores."""
+        # Embed the query once and reuse the vector for every store
+        vector = self.embeddings.embed_query(query)
+
+        def search(item):
+            pos, store = item
+            return [
+                (score, pos, doc)
+                for doc, score in store.similarity_search_with_score_by_vector(vector, k=k)
+            ]
+
+        stores = list(enumerate(self.vector_stores))
+        if len(stores) == 1:
+            results = [search(stores[0])]
+        else:
+            results = list(_search_pool.map(search, stores))
+
+        # Each result list is already sorted by distance → k-way heap merge
+        return list(islice(heapq.merge(*results, key=lambda hit: hit[0]), k))
+
+    def _keyword_hits(self, query, k):
+        """(score, store position, document) for the k best BM25 matches across all stores."""
+        hits = []
+        for pos, store in enumerate(self.vector_stores):
+            keyword_index = getattr(store, "keyword_index", None)
+            if keyword_index is None:
+                continue
+            for doc_id, score in keyword_index.search(query, k):
+                hits.append((score, pos, doc_id))
+
+        best = heapq.nlargest(k, hits, key=lambda hit: hit[0])
+        return [
+            (score, pos, self.vector_stores[pos].docstore.search(doc_id))
+            for score, pos, doc_id in best
+        ]
+
+    def _is_identifier_lookup(self, query):
+        """Query contains an ID-like token that some keyword index knows exactly."""
+        for token in IDENTIFIER_RE.findall(query):
+            for store in self.vector_stores:
+                keyword_index = getattr(store, "keyword_index", None)
+                if keyword_index is not None and keyword_index.has_term(token):
+                    return True
+        return False
+
+    def is_keyword_only(self, query):
+        """True when _get_relevant_documents answers query from BM25 alone."""
+        return self.hybrid and self._is_identifier_lookup(query)
+
+    def search_with_scores(self, query, k=None):
+        """Return the k closest (document, distance) pairs across all stores."""
+        return [(doc, score) for score, _, doc in self._vector_hits(query, k or self.k)]
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        if not self.hybrid:
+            return [doc for doc, _ in self.search_with_scores(query)]
+
+        keyword_hits = self._keyword_hits(query, self.fetch_k)
+
+        # Exact identifier lookups are answered from BM25 alone, without an embedding call
+        if keyword_hits and self._is_identifier_lookup(query):
+            return [doc for _, _, doc in keyword_hits[:self.k]]
+
+        vector_hits = self._vector_hits(query, self.fetch_k)
+
+        docs_by_key = {}
+        rankings = []
+        for hits in (vector_hits, keyword_hits):
+            ranking = []
+            for _, pos, doc in hits:
+                key = _doc_key(pos, doc)
+                docs_by_key.setdefault(key, doc)
+                ranking.append(key)
+            rankings.append(ranking)
+
+        fused = reciprocal_rank_fusion(rankings)
+        return [docs_by_key[key] for key in fused[:self.k]]
+
+
+class MultiIndexStore:
+    """Read-only view over several vector stores that exposes as_retriever() like a single store."""
+
+    def __init__(self, vector_stores, embeddings):
+        self.vector_stores = list(vector_stores)
+        self.embeddings = embeddings
+
+    def as_retriever(self, search_type="similarity", search_kwargs=None, **kwargs):
+        search_kwargs = search_kwargs or {}
+        return MultiIndexRetriever(
+            vector_stores=self.vector_stores,
+            embeddings=self.embeddings,
+            k=search_kwargs.get("k", 4),
+            fetch_k=search_kwargs.get("fetch_k", 20),
+            hybrid=search_type == "hybrid",
+        )
@@ -0,0 +1,143 @@
+import os
+import json
+import sqlite3
+import threading
+import faiss
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore, AddableMixin
+from langchain_community.vectorstores import FAISS
+
+INDEX_NAME = "index.faiss"
+DOCSTORE_NAME = "docstore.sqlite"
+LEGACY_PICKLE_NAME = "index.pkl"
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    Docstore backed by SQLite instead of a pickled dict. Documents are read
+    on demand, so loading a store only reads the position → id map.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS index_map (pos INTEGER PRIMARY KEY, id TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def add(self, texts):
+        rows = [
+            (doc_id, doc.page_content, json.dumps(doc.metadata, default=str))
+            for doc_id, doc in texts.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO docs (id, content, metadata) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def delete(self, ids):
+        with self._lock:
+            self._conn.executemany("DELETE FROM docs WHERE id = ?", [(doc_id,) for doc_id in ids])
+            self._conn.commit()
+
+    def search(self, search):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, metadata FROM docs WHERE id = ?", (search,)
+            ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def load_index_map(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT pos, id FROM index_map").fetchall()
+        return {pos: doc_id for pos, doc_id in rows}
+
+    def save_index_map(self, index_to_docstore_id):
+        """Replace the position → id map and drop documents it no longer references."""
+        with self._lock:
+            self._conn.execute("DELETE FROM index_map")
+            self._conn.executemany(
+                "INSERT INTO index_map (pos, id) VALUES (?, ?)",
+                list(index_to_docstore_id.items())
+            )
+            self._conn.execute("DELETE FROM docs WHERE id NOT IN (SELECT id FROM index_map)")
+            self._conn.commit()
+
+
+def read_index(path, mmap=True):
+    """Read a FAISS index, memory-mapping it when the index type supports it."""
+    if mmap:
+        for flag_name in ("IO_FLAG_MMAP_IFC", "IO_FLAG_MMAP"):
+            flag = getattr(faiss, flag_name, None)
+            if flag is None:
+                continue
+            try:
+                return faiss.read_index(path, flag)
+            except RuntimeError:
+                continue
+    return faiss.read_index(path)
+
+
+def is_legacy_store(folder_path):
+    """Store written by FAISS.save_local (pickled docstore) and not yet migrated."""
+    return (
+        os.path.exists(os.path.join(folder_path, LEGACY_PICKLE_NAME))
+        and not os.path.exists(os.path.join(folder_path, DOCSTORE_NAME))
+    )
+
+
+def save_store(vector_store, folder_path):
+    """Write the FAISS index plus a SQLite docstore, replacing any legacy index.pkl."""
+    os.makedirs(folder_path, exist_ok=True)
+    db_path = os.path.join(folder_path, DOCSTORE_NAME)
+
+    docstore = vector_store.docstore
+    if not (isinstance(docstore, SQLiteDocstore) and os.path.abspath(docstore.path) == os.path.abspath(db_path)):
+        # Copy documents out of the in-memory (or other) docstore
+        target = SQLiteDocstore(db_path)
+        target.add({
+            doc_id: docstore.search(doc_id)
+            for doc_id in vector_store.index_to_docstore_id.values()
+        })
+        vector_store.docstore = target
+        docstore = target
+
+    docstore.save_index_map(vector_store.index_to_docstore_id)
+
+    index_path = os.path.join(folder_path, INDEX_NAME)
+    tmp_path = index_path + ".tmp"
+    faiss.write_index(vector_store.index, tmp_path)
+    os.replace(tmp_path, index_path)
+
+    legacy_path = os.path.join(folder_path, LEGACY_PICKLE_NAME)
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+
+def load_store(folder_path, embeddings, mmap=True):
+    """
+    Load a store saved by save_store. With mmap=True the index is memory-mapped
+    and read-only (shared between processes); pass mmap=False to modify it.
+    Legacy pickle stores are converted on first load.
+    """
+    if is_legacy_store(folder_path):
+        vector_store = FAISS.load_local(
+            folder_path,
+            embeddings,
+            allow_dangerous_deserialization=True
+        )
+        save_store(vector_store, folder_path)
+        return vector_store
+
+    index = read_index(os.path.join(folder_path, INDEX_NAME), mmap=mmap)
+    docstore = SQLiteDocstore(os.path.join(folder_path, DOCSTORE_NAME))
+    return FAISS(embeddings, index, docstore, docstore.load_index_map())
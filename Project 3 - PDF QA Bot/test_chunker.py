@@ -0,0 +1,21 @@
+import pytest
+
+pytest.importorskip("tiktoken")
+pytest.importorskip("langchain_core")
+
+from chunker import split_sentences, TokenChunker
+
+
+def test_split_sentences_keeps_closing_punctuation():
+    text = 'He said "Stop." Then he left. (See the figure.) Next one! Why? Yes.'
+    sentences = split_sentences(text)
+    assert sentences == [
+        'He said "Stop."', "Then he left.", "(See the figure.)", "Next one!", "Why?", "Yes.",
+    ]
+    assert " ".join(sentences) == text
+
+
+def test_split_text_loses_no_characters():
+    text = 'Intro "quoted." [Bracketed.] More text here.\n\nSecond paragraph (aside.) End.'
+    chunks = TokenChunker(max_tokens=8, overlap_tokens=0, min_tokens=0).split_text(text)
+    assert "".join(" ".join(chunks).split()) == "".join(text.split())
@@ -1,5 +1,6 @@
 import openai
 import os
+import sys
 import json
 import pandas as pd
 import requests
@@ -19,8 +20,12 @@ with open(key_path) as f:
 
 client = openai.OpenAI(api_key=key_data["openai_api_key"])
 
-# Load embedding model
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+# Shared embedding cache lives at the repo root
+sys.path.append(parent_dir)
+from common.embedding_cache import CachedSentenceEncoder
+
+# Load embedding model (wrapped so repeated page texts are never re-encoded)
+embedder = CachedSentenceEncoder(SentenceTransformer("all-MiniLM-L6-v2"), "all-MiniLM-L6-v2")
 
 
 def fetch_urls_from_sitemap(sitemap_url: str) -> List[str]:
@@ -42,14 +47,14 @@ def fetch_page_text(url: str) -> str:
 
 
 def find_relevant_urls(content: str, all_urls: List[str], page_texts: dict, top_k=5) -> List[str]:
-    content_embedding = embedder.encode(content, convert_to_tensor=True)
+    content_embedding = embedder.encode(content)
     candidates = []
     for url in all_urls:
         if url not in page_texts:
             page_texts[url] = fetch_page_text(url)
         if not page_texts[url]:
             continue
-        url_embedding = embedder.encode(page_texts[url], convert_to_tensor=True)
+        url_embedding = embedder.encode(page_texts[url])
         score = util.cos_sim(content_embedding, url_embedding).item()
         candidates.append((url, score))
 
@@ -117,6 +122,8 @@ if urls and st.button("Generate Internal Linking Suggestions"):
     with st.spinner("Processing pages and generating suggestions using vector search..."):
         df = process_urls(urls)
         st.success("✅ Suggestions generated!")
+        cache_stats = embedder.cache.stats()
+        st.caption(f"Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
         st.dataframe(df)
 
         # Prepare Excel file in memory
@@ -0,0 +1,102 @@
+"""
+Batch question answering for the P1 RAG scripts: one loaded index, many
+questions answered concurrently, with per-question latency and token usage.
+
+Questions come from JSONL ({"question": ..., "id": optional}) or CSV (a
+"question" column, optional "id"). Any other non-empty fields of a row
+(e.g. "corpus") are passed to the answer function as keyword arguments.
+Results are written as JSONL, or CSV if the output path ends in .csv.
+"""
+import csv
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from langchain_community.callbacks import get_openai_callback
+
+MAX_CONCURRENCY = 4
+FIELDS = [
+    "id", "question", "corpus", "answer", "route", "latency_s",
+    "prompt_tokens", "completion_tokens", "total_tokens", "cost_usd", "error",
+]
+
+
+def read_questions(path):
+    """[(id, question, other fields)] from a JSONL or CSV file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    return [
+        (row.pop("id", None) or str(i), row.pop("question"), {key: value for key, value in row.items() if value})
+        for i, row in enumerate(rows, start=1)
+    ]
+
+
+def answer_one(answer_fn, qid, question, options=None):
+    """Run one question; token usage is counted per call by the OpenAI callback."""
+    start = time.perf_counter()
+    record = {"id": qid, "question": question, "answer": None, "error": None}
+    # The callback handler is a context variable, so each worker thread counts its own calls
+    with get_openai_callback() as cb:
+        try:
+            result = answer_fn(question, **(options or {}))
+            # answer_fn may return the answer or a dict with "answer" plus extras (e.g. "route")
+            record.update(result if isinstance(result, dict) else {"answer": result})
+        except Exception as exc:
+            record["error"] = f"{type(exc).__name__}: {exc}"
+    record.update(
+        latency_s=round(time.perf_counter() - start, 3),
+        prompt_tokens=cb.prompt_tokens,
+        completion_tokens=cb.completion_tokens,
+        total_tokens=cb.total_tokens,
+        cost_usd=round(cb.total_cost, 6),
+    )
+    return record
+
+
+def write_results(path, records):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def run_batch(answer_fn, input_path, output_path, max_concurrency=MAX_CONCURRENCY):
+    """Answer every question in input_path with answer_fn(question, **fields), at most max_concurrency at once."""
+    questions = read_questions(input_path)
+    start = time.perf_counter()
+    records = [None] * len(questions)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = {
+            pool.submit(answer_one, answer_fn, qid, question, options): i
+            for i, (qid, question, options) in enumerate(questions)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            records[futures[future]] = future.result()
+            print(f"\r{done}/{len(questions)} answered", end="", flush=True)
+    print()
+
+    # Keep input order in the output file
+    write_results(output_path, records)
+
+    latencies = sorted(record["latency_s"] for record in records)
+    errors = sum(1 for record in records if record["error"])
+    routes = Counter(record.get("route") for record in records if record.get("route"))
+    if latencies:
+        print(
+            f"{len(records)} questions in {time.perf_counter() - start:.1f}s "
+            f"({errors} errors), latency p50 {latencies[len(latencies) // 2]:.2f}s "
+            f"p95 {latencies[int(len(latencies) * 0.95)]:.2f}s, "
+            f"{sum(record['total_tokens'] for record in records)} tokens → {output_path}"
+        )
+    if routes:
+        print(f"Routes: {dict(routes)}")
+    return records
@@ -0,0 +1,103 @@
+"""
+Benchmark: filtered search on one shared multi-corpus index vs one index per
+corpus, on synthetic vectors (no API calls).
+
+For corpora of different sizes it compares, per query restricted to one
+corpus:
+  separate      search that corpus's own index
+  pre-filter    shared index + FAISS id selector (shared_index.SharedIndex)
+  post-filter   shared index, fetch FETCH_K hits then drop other corpora
+                (what FAISS.similarity_search(filter=...) does)
+and reports recall@k against exact per-corpus search, p50/p95 latency and
+total index memory. Each corpus's queries are drawn near its own indexed
+chunks, as a question about that document would be.
+
+Usage:
+    python bench_filtered_search.py [total_vectors] [dim] [flat|hnsw|ivf_flat]
+"""
+import os
+import sys
+import time
+import numpy as np
+import faiss
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.index_factory import build_index, min_ann_vectors
+from common.bench_data import clustered_vectors, sample_queries, index_size_mb, percentiles
+from shared_index import _search_params
+
+K = 4
+FETCH_K = 20  # LangChain's default fetch_k for filtered FAISS search
+NUM_QUERIES = 200
+# Share of the shared index held by each corpus: one large, one medium, one small
+CORPUS_SHARES = {"large": 0.85, "medium": 0.14, "small": 0.01}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 1536
+    index_type = sys.argv[3] if len(sys.argv) > 3 else "flat"
+    faiss.omp_set_num_threads(1)  # per-query latency, as in the service
+    rng = np.random.default_rng(0)
+
+    # Corpora are interleaved in the shared index, as after several builds
+    labels = rng.choice(list(CORPUS_SHARES), size=n, p=list(CORPUS_SHARES.values()))
+    vectors = clustered_vectors(n, dim, rng)
+    query_rng = np.random.default_rng(1)
+
+    shared = build_index(vectors, index_type=index_type)
+    separate = {}
+    positions = {}
+    for corpus in CORPUS_SHARES:
+        positions[corpus] = np.flatnonzero(labels == corpus).astype("int64")
+        kind = index_type if len(positions[corpus]) >= min_ann_vectors(index_type) else "flat"
+        separate[corpus] = build_index(vectors[positions[corpus]], index_type=kind)
+
+    print(
+        f"{n} vectors, dim {dim}, {index_type}: shared index {index_size_mb(shared):.1f} MB, "
+        f"separate indexes {sum(index_size_mb(index) for index in separate.values()):.1f} MB"
+    )
+    print(f"{'corpus':<8} {'size':>7} {'method':<12} {'recall@' + str(K):>9} {'p50 ms':>8} {'p95 ms':>8}")
+
+    for corpus, ids in positions.items():
+        queries = sample_queries(vectors[ids], NUM_QUERIES, query_rng)
+
+        # Exact top-k within the corpus is the ground truth
+        exact = faiss.IndexFlatL2(dim)
+        exact.add(vectors[ids])
+        _, truth = exact.search(queries, K)
+        truth = [set(ids[row]) for row in truth]
+
+        selector = faiss.IDSelectorBatch(ids)
+        params = _search_params(shared, selector)
+        in_corpus = labels == corpus
+
+        def run_separate(q):
+            _, found = separate[corpus].search(q, K)
+            return ids[found[0][found[0] >= 0]]
+
+        def run_prefilter(q):
+            _, found = shared.search(q, K, params=params)
+            return found[0][found[0] >= 0]
+
+        def run_postfilter(q):
+            _, found = shared.search(q, FETCH_K)
+            found = found[0][found[0] >= 0]
+            return found[in_corpus[found]][:K]
+
+        for method, search in (("separate", run_separate), ("pre-filter", run_prefilter),
+                               ("post-filter", run_postfilter)):
+            latencies = []
+            hits = 0
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                found = search(query.reshape(1, -1))
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += len(set(found.tolist()) & truth[i])
+            p50, p95 = percentiles(latencies)
+            recall = hits / (len(queries) * K)
+            print(f"{corpus:<8} {len(ids):>7} {method:<12} {recall:>9.3f} {p50:>8.3f} {p95:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+The P1 RAG document collections. The per-corpus scripts (main.py,
+business_info.py) and the shared multi-corpus service (rag_service.py) all
+read their PDF, tool and prompt settings from here.
+"""
+
+CORPORA = {
+    "atomic_habits": {
+        "pdf": "docs/Atomic habits.pdf",
+        "tool_name": "Atomic_Habits_Chapter_Search",
+        "tool_description": "Retrieve detailed information about the chapters of the book Atomic Habits by James Clear.",
+        "instructions": """
+You are an assistant helping a student study the book 'Atomic Habits' by James Clear.
+Answer ONLY based on the provided PDF content.
+Do NOT make up information.
+Use the exact wording or close wording from the document if possible.
+Context = The user is conducting research on Atomic Habits by James Clear and is seeking detailed information on the chapters of the book.
+""",
+        "default_question": "What are the three laws explained in the book Atomic Habits by James Clear?",
+    },
+    "business_info": {
+        "pdf": "docs/business_info.pdf",  # <--- Your business info PDF
+        "tool_name": "Business_Info_Company_Search",
+        "tool_description": "Retrieve detailed information about companies listed inside the Business Info document.",
+        "instructions": """You need to answer the question exactly based on the document content.
+If information is NOT found, say: 'Information not found in document.'
+Context = The user is asking about companies mentioned inside the Business Info PDF.
+""",
+        "default_question": "What is Oravil?",
+    },
+}
@@ -0,0 +1,125 @@
+"""
+Build-once, serve-many FAISS index for the P1 RAG scripts.
+
+`build_shared_index` loads and splits every corpus PDF once, embeds them into
+one index (see shared_index.py) and saves it with a meta.json recording each
+source fingerprint and the chunking settings. `load_index` only reads that
+saved index, so answering a question no longer re-parses or re-embeds the
+PDFs on every process start.
+"""
+import os
+import sys
+import json
+import time
+
+from langchain_community.document_loaders import PyPDFLoader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.index_builder import build_faiss_index, clear_checkpoints
+from common.index_factory import convert_store_index, tune_index
+from common.file_hash import hash_file
+
+CHUNK_SIZE = 1500
+CHUNK_OVERLAP = 0
+META_NAME = "meta.json"
+
+
+def source_fingerprint(pdf_path):
+    stat = os.stat(pdf_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "md5": hash_file(pdf_path)}
+
+
+def read_meta(index_dir):
+    try:
+        with open(os.path.join(index_dir, META_NAME), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def is_source_current(saved, pdf_path):
+    """True if pdf_path still matches a fingerprint recorded by source_fingerprint."""
+    stat = os.stat(pdf_path)
+    # Same size and mtime → unchanged, without rehashing the PDF
+    if (saved["size"], saved["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        return True
+    return saved["md5"] == hash_file(pdf_path)
+
+
+def load_chunks(pdf_path, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, **metadata):
+    """Load and split a PDF; extra metadata (e.g. corpus=...) is added to every chunk."""
+    # One pass over the PDF: load() then split, instead of load_and_split() plus load()
+    pages = PyPDFLoader(pdf_path).load()
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = splitter.split_documents(pages)
+    for chunk in chunks:
+        chunk.metadata.update(metadata)
+    return chunks
+
+
+def _save(chunks, index_dir, embeddings, meta):
+    checkpoint_dir = os.path.join(index_dir, "checkpoints")
+    vectorstore = convert_store_index(build_faiss_index(chunks, embeddings, checkpoint_dir=checkpoint_dir))
+    vectorstore.save_local(index_dir)
+    clear_checkpoints(checkpoint_dir)
+
+    meta.update(index_type=type(vectorstore.index).__name__, built=time.time())
+    tmp_path = os.path.join(index_dir, META_NAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(index_dir, META_NAME))
+    return vectorstore
+
+
+def build_shared_index(corpora, index_dir, embeddings, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """
+    One index over several PDFs ({corpus name: pdf path}). Every chunk carries
+    corpus, source and page metadata for filtering at search time; meta.json
+    records each corpus's fingerprint. Rebuilding after one corpus changes
+    re-embeds only that corpus; the others come from the embedding cache.
+    """
+    start = time.perf_counter()
+    chunks = []
+    sources = {}
+    for name, pdf_path in corpora.items():
+        corpus_chunks = load_chunks(pdf_path, chunk_size, chunk_overlap, corpus=name)
+        chunks.extend(corpus_chunks)
+        sources[name] = {"path": pdf_path, "chunks": len(corpus_chunks), **source_fingerprint(pdf_path)}
+
+    vectorstore = _save(chunks, index_dir, embeddings, {
+        "corpora": sources,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "chunks": len(chunks),
+    })
+    print(f"Built {index_dir}: {len(corpora)} corpora, {len(chunks)} chunks in {time.perf_counter() - start:.1f}s")
+    return vectorstore
+
+
+def load_index(index_dir, embeddings, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """
+    Load a prebuilt index. If a corpus PDF or the chunk settings changed since
+    the build, a warning is printed; the saved index is still served.
+    """
+    meta = read_meta(index_dir)
+    if meta is None:
+        raise FileNotFoundError(
+            f"No prebuilt index in {index_dir}. Run: python {os.path.basename(sys.argv[0])} build"
+        )
+
+    if (meta["chunk_size"], meta["chunk_overlap"]) != (chunk_size, chunk_overlap):
+        print(
+            f"Warning: {index_dir} was chunked with size {meta['chunk_size']}/overlap {meta['chunk_overlap']}, "
+            f"not {chunk_size}/{chunk_overlap}; run the build command again."
+        )
+    for saved in meta.get("corpora", {}).values():
+        path = saved["path"]
+        if os.path.exists(path) and not is_source_current(saved, path):
+            print(f"Warning: {path} changed since {index_dir} was built; run the build command again.")
+
+    # The index files are written by build_shared_index above, never taken from users
+    vectorstore = FAISS.load_local(index_dir, embeddings, allow_dangerous_deserialization=True)
+    tune_index(vectorstore.index)
+    return vectorstore
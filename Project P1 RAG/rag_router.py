@@ -0,0 +1,52 @@
+"""
+Router for the single-tool P1 RAG agents: retrieve directly and answer with
+one grounded completion, and only fall back to the agent loop when the best
+retrieved chunk scores below ROUTER_MIN_SCORE.
+
+The agent spends one LLM call deciding to call its only tool and another to
+answer; the direct path makes one.
+"""
+import os
+from langchain_core.messages import SystemMessage, HumanMessage
+
+# "router" tries direct retrieval first; "agent" always uses the agent loop
+ROUTE = os.environ.get("RAG_ROUTE", "router")
+ROUTER_K = 4
+# Relevance in [0, 1] (FAISS distance mapped by LangChain); below this the agent decides
+ROUTER_MIN_SCORE = float(os.environ.get("RAG_ROUTER_MIN_SCORE", "0.7"))
+
+GROUNDED_PROMPT = """{instructions}
+
+Answer using only the document excerpts below. If they do not contain the
+answer, say: 'Information not found in document.'
+
+{excerpts}"""
+
+
+def format_excerpts(docs):
+    return "\n\n".join(
+        f"[page {doc.metadata.get('page', 0) + 1}]\n{doc.page_content}" for doc in docs
+    )
+
+
+def route_question(vectorstore, question, llm, instructions, fallback,
+                   k=ROUTER_K, min_score=ROUTER_MIN_SCORE):
+    """
+    Return {"answer", "route", "top_score"}. fallback(question) is called
+    (the agent) when the best chunk scores below min_score.
+    """
+    hits = vectorstore.similarity_search_with_relevance_scores(question, k=k)
+    top_score = max((score for _, score in hits), default=0.0)
+
+    if top_score < min_score:
+        return {"answer": fallback(question), "route": "agent", "top_score": round(top_score, 4)}
+
+    messages = [
+        SystemMessage(content=GROUNDED_PROMPT.format(
+            instructions=instructions.strip(),
+            excerpts=format_excerpts([doc for doc, _ in hits])
+        )),
+        HumanMessage(content=question),
+    ]
+    response = llm.invoke(messages)
+    return {"answer": response.content, "route": "direct", "top_score": round(top_score, 4)}
@@ -0,0 +1,177 @@
+"""
+One long-running service for every P1 RAG corpus: a single shared index with
+corpus/source/page metadata, filtered at search time instead of loading a
+separate store per corpus.
+
+main.py and business_info.py are the same service fixed to one corpus
+(see corpus_cli).
+
+Usage:
+    python rag_service.py build
+    python rag_service.py query --corpus business_info "What is Oravil?"
+    python rag_service.py batch questions.jsonl answers.jsonl   # rows may set "corpus"
+    python rag_service.py serve < questions.jsonl               # JSONL in, JSONL out
+"""
+from langchain_openai import OpenAIEmbeddings
+from langchain.agents.agent_toolkits import create_retriever_tool, create_conversational_retrieval_agent
+from langchain_openai.chat_models import ChatOpenAI
+import os
+import sys
+import json
+import time
+import argparse
+
+# Load OpenAI API Key
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+key_path = os.path.join(parent_dir, 'key.json')
+
+with open(key_path) as f:
+    key_data = json.load(f)
+
+os.environ["OPENAI_API_KEY"] = key_data["openai_api_key"]
+
+# Shared embedding cache lives at the repo root
+sys.path.append(parent_dir)
+from common.embedding_cache import CachedEmbeddings
+from rag_index import build_shared_index, load_index
+from shared_index import SharedIndex, FILTER_FIELDS
+from batch_qa import run_batch, MAX_CONCURRENCY
+from rag_router import route_question, ROUTE
+from corpora import CORPORA
+
+INDEX_DIR = os.path.join("store", "shared")
+DEFAULT_CORPUS = "atomic_habits"
+
+embeddings = CachedEmbeddings(OpenAIEmbeddings())
+llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo")
+
+
+def run_agent(view, corpus, question):
+    """Fresh single-tool agent over one corpus's slice of the shared index."""
+    config = CORPORA[corpus]
+    tool = create_retriever_tool(view.as_retriever(), config["tool_name"], config["tool_description"])
+    agent = create_conversational_retrieval_agent(llm=llm, tools=[tool], verbose=False)
+    return agent.invoke({"input": f"{config['instructions']}Question = {question}\n"})["output"]
+
+
+def answer(index, question, corpus=DEFAULT_CORPUS, **fields):
+    """
+    Answer from one corpus; source=<pdf path> and page=<1-based page number>
+    narrow the search further. Other fields (e.g. a batch row's "expected"
+    or "notes" column) are ignored.
+    """
+    if corpus not in CORPORA:
+        raise ValueError(f"Unknown corpus {corpus!r}; expected one of {sorted(CORPORA)}")
+    filters = {field: value for field, value in fields.items() if field in FILTER_FIELDS}
+    if "page" in filters:
+        # Chunk metadata counts pages from 0
+        filters["page"] = int(filters["page"]) - 1
+
+    view = index.view(corpus=corpus, **filters)
+    if ROUTE == "agent":
+        result = {"answer": run_agent(view, corpus, question), "route": "agent"}
+    else:
+        result = route_question(
+            view, question, llm, CORPORA[corpus]["instructions"],
+            fallback=lambda q: run_agent(view, corpus, q)
+        )
+    return {"corpus": corpus, **result}
+
+
+def build():
+    build_shared_index({name: config["pdf"] for name, config in CORPORA.items()}, INDEX_DIR, embeddings)
+    print(f"Embedding cache: {embeddings.cache.stats()}")
+
+
+def load_service():
+    start = time.perf_counter()
+    index = SharedIndex(load_index(INDEX_DIR, embeddings), embeddings)
+    print(f"Shared index loaded in {time.perf_counter() - start:.2f}s: corpora {index.corpora()}", file=sys.stderr)
+    return index
+
+
+def serve(index):
+    """Answer JSONL requests ({"question", "corpus", ...}) from stdin until EOF, one JSON line each."""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        request_id = request.pop("id", None)
+        start = time.perf_counter()
+        try:
+            response = answer(index, request.pop("question"), **request)
+        except Exception as exc:
+            response = {"error": f"{type(exc).__name__}: {exc}"}
+        if request_id is not None:
+            response["id"] = request_id
+        response["latency_s"] = round(time.perf_counter() - start, 3)
+        print(json.dumps(response, ensure_ascii=False), flush=True)
+
+
+def corpus_cli(corpus):
+    """
+    Command line of a single-corpus script: build, query (the default mode)
+    and batch, all answered from that corpus's view of the shared index.
+    """
+    parser = argparse.ArgumentParser()
+    modes = parser.add_subparsers(dest="mode")
+    modes.add_parser("build", help="build the shared index (every corpus) once")
+    query_parser = modes.add_parser("query", help="answer one question from the saved index")
+    query_parser.add_argument("question", nargs="*")
+    batch_parser = modes.add_parser("batch", help="answer a JSONL/CSV file of questions")
+    batch_parser.add_argument("input")
+    batch_parser.add_argument("output")
+    batch_parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+
+    # A bare question (no mode) is a query, as before
+    argv = sys.argv[1:]
+    if argv and argv[0] not in ("build", "query", "batch", "-h", "--help"):
+        argv = ["query"] + argv
+    args = parser.parse_args(argv or ["query"])
+
+    if args.mode == "build":
+        build()
+        return
+
+    start = time.perf_counter()
+    index = load_service()
+    if args.mode == "batch":
+        # Every row is answered from this script's corpus, whatever the row says
+        run_batch(lambda question, **fields: answer(index, question, **{**fields, "corpus": corpus}),
+                  args.input, args.output, args.concurrency)
+    else:
+        result = answer(index, " ".join(args.question) or CORPORA[corpus]["default_question"], corpus)
+        print(result["answer"])
+        print(f"Route: {result['route']}")
+        print(f"Answered in {time.perf_counter() - start:.2f}s")
+    print(f"Embedding cache: {embeddings.cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    modes = parser.add_subparsers(dest="mode", required=True)
+    modes.add_parser("build", help="build one index over every corpus")
+    query_parser = modes.add_parser("query", help="answer one question")
+    query_parser.add_argument("question", nargs="+")
+    query_parser.add_argument("--corpus", default=DEFAULT_CORPUS, choices=sorted(CORPORA))
+    batch_parser = modes.add_parser("batch", help="answer a JSONL/CSV file of questions")
+    batch_parser.add_argument("input")
+    batch_parser.add_argument("output")
+    batch_parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+    modes.add_parser("serve", help="answer JSONL requests from stdin")
+    args = parser.parse_args()
+
+    if args.mode == "build":
+        build()
+    else:
+        index = load_service()
+        if args.mode == "query":
+            result = answer(index, " ".join(args.question), args.corpus)
+            print(result["answer"])
+            print(f"Route: {result['route']}")
+        elif args.mode == "batch":
+            run_batch(lambda question, **fields: answer(index, question, **fields),
+                      args.input, args.output, args.concurrency)
+        else:
+            serve(index)
@@ -0,0 +1,133 @@
+"""
+Metadata-filtered search over the shared multi-corpus index.
+
+Chunks of every corpus live in one FAISS index. Their corpus, source and
+page are kept as NumPy columns by vector position, so a filter becomes an
+id selector that FAISS applies during the search (pre-filtering). Results
+are the exact top-k of the matching chunks. A post-filter over a fixed
+fetch_k can return fewer than k hits for a small corpus.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+import numpy as np
+import faiss
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+FILTER_FIELDS = ("corpus", "source", "page")
+SELECTOR_CACHE_SIZE = 64
+
+
+def _search_params(index, selector):
+    """Search parameters carrying the id selector, keeping the index's query-time knobs."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+class SharedIndex:
+    """A LangChain FAISS store plus per-vector metadata columns for filtering."""
+
+    def __init__(self, vectorstore, embeddings):
+        self.store = vectorstore
+        self.embeddings = embeddings
+        self.relevance_fn = vectorstore._select_relevance_score_fn()
+
+        positions = range(vectorstore.index.ntotal)
+        docs = [vectorstore.docstore.search(vectorstore.index_to_docstore_id[pos]) for pos in positions]
+        self.docs = docs
+        self.columns = {
+            field: np.array([doc.metadata.get(field) for doc in docs], dtype=object)
+            for field in FILTER_FIELDS
+        }
+        self._selectors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def corpora(self):
+        return sorted(set(self.columns["corpus"]))
+
+    def _mask(self, filter):
+        mask = np.ones(len(self.docs), dtype=bool)
+        for field, value in filter.items():
+            if field not in self.columns:
+                raise ValueError(f"Cannot filter on {field!r}; filterable fields are {FILTER_FIELDS}")
+            column = self.columns[field]
+            if isinstance(value, (list, tuple, set, range)):
+                mask &= np.isin(column, list(value))
+            else:
+                mask &= column == value
+        return mask
+
+    def _selector(self, filter):
+        """(matching vector ids, FAISS selector), cached per filter."""
+        key = tuple(sorted(
+            (field, tuple(value) if isinstance(value, (list, tuple, set, range)) else value)
+            for field, value in filter.items()
+        ))
+        with self._lock:
+            if key in self._selectors:
+                self._selectors.move_to_end(key)
+                return self._selectors[key]
+
+        ids = np.flatnonzero(self._mask(filter)).astype("int64")
+        entry = (ids, faiss.IDSelectorBatch(ids))
+        with self._lock:
+            self._selectors[key] = entry
+            while len(self._selectors) > SELECTOR_CACHE_SIZE:
+                self._selectors.popitem(last=False)
+        return entry
+
+    def search_by_vector(self, vector, k=4, filter=None):
+        """[(document, distance)] for the k closest chunks matching filter."""
+        query = np.asarray([vector], dtype="float32")
+        params = None
+        if filter:
+            ids, selector = self._selector(filter)
+            if not len(ids):
+                return []
+            k = min(k, len(ids))
+            params = _search_params(self.store.index, selector)
+
+        distances, positions = self.store.index.search(query, k, params=params)
+        return [
+            (self.docs[pos], float(distance))
+            for distance, pos in zip(distances[0], positions[0])
+            if pos != -1
+        ]
+
+    def search(self, query, k=4, filter=None):
+        return self.search_by_vector(self.embeddings.embed_query(query), k, filter)
+
+    def view(self, **filter):
+        """A store-like view restricted to matching chunks, e.g. view(corpus="business_info")."""
+        return CorpusView(index=self, filter=filter)
+
+
+class CorpusView:
+    """What the router and the agent tool need from a vector store, limited to one filter."""
+
+    def __init__(self, index, filter):
+        self.index = index
+        self.filter = filter
+
+    def similarity_search_with_relevance_scores(self, query, k=4):
+        return [
+            (doc, self.index.relevance_fn(distance))
+            for doc, distance in self.index.search(query, k, self.filter)
+        ]
+
+    def as_retriever(self, k=4):
+        return FilteredRetriever(index=self.index, filter=self.filter, k=k)
+
+
+class FilteredRetriever(BaseRetriever):
+    index: Any
+    filter: Dict[str, Any]
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return [doc for doc, _ in self.index.search(query, self.k, self.filter)]
@@ -0,0 +1,38 @@
+"""
+Synthetic vectors and measurements shared by the FAISS benchmarks
+(bench_index_types.py, bench_filtered_search.py). No API calls.
+"""
+import os
+import tempfile
+import numpy as np
+import faiss
+
+
+def clustered_vectors(n, dim, rng=0):
+    """Gaussian blobs roughly mimic how chunk embeddings group by topic. rng is a seed or a Generator."""
+    rng = np.random.default_rng(rng)
+    centers = rng.standard_normal((max(n // 500, 8), dim)).astype("float32")
+    labels = rng.integers(0, len(centers), n)
+    return centers[labels] + 0.3 * rng.standard_normal((n, dim)).astype("float32")
+
+
+def sample_queries(vectors, count, rng=1):
+    """
+    Queries near indexed points: random rows plus the same noise as the
+    clusters, so they land inside the indexed topics and have real near neighbours.
+    """
+    rng = np.random.default_rng(rng)
+    rows = vectors[rng.choice(len(vectors), count, replace=len(vectors) < count)]
+    return rows + 0.3 * rng.standard_normal(rows.shape).astype("float32")
+
+
+def index_size_mb(index):
+    with tempfile.NamedTemporaryFile(suffix=".faiss") as tmp:
+        faiss.write_index(index, tmp.name)
+        return os.path.getsize(tmp.name) / (1024 * 1024)
+
+
+def percentiles(latencies):
+    """(p50, p95) of a list of latencies."""
+    latencies = sorted(latencies)
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
@@ -0,0 +1,230 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:  # Project 6 only needs the SentenceTransformer wrapper
+    Embeddings = object
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH", os.path.join(REPO_DIR, ".cache", "embeddings.sqlite")
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def normalize_text(text):
+    """Normalize unicode and whitespace so trivially different strings share a key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_name, text):
+    """Content-addressed key for (model name, normalized text)."""
+    payload = f"{model_name}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache. Vectors are stored as raw float32 blobs and
+    the least recently used rows are evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " nbytes INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+
+    def get_many(self, model_name, texts):
+        """Return a list with a vector for each cached text and None for misses."""
+        keys = [cache_key(model_name, text) for text in texts]
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for vector in results if vector is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model_name, texts, vectors):
+        """Store vectors for texts and evict old rows if over budget."""
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = array("f", vector).tobytes()
+            rows.append((cache_key(model_name, text), model_name, blob, len(blob), now))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, nbytes, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used rows until the cache is back under 90% of max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        cursor = self._conn.execute("SELECT key, nbytes FROM embeddings ORDER BY last_used")
+        for key, nbytes in cursor:
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= nbytes
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+
+    def stats(self):
+        """Hit/miss counters plus current size of the cache."""
+        with self._lock:
+            entries, nbytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM embeddings"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": nbytes,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Process-wide cache instance shared by every wrapper."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
+
+
+def _unique_missing(model_name, texts, missing):
+    """Indices of missing texts with duplicates (after normalization) removed."""
+    seen = set()
+    unique = []
+    for i in missing:
+        key = cache_key(model_name, texts[i])
+        if key not in seen:
+            seen.add(key)
+            unique.append(i)
+    return unique
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain Embeddings wrapper (e.g. around OpenAIEmbeddings) that consults the cache first."""
+
+    def __init__(self, embeddings, cache=None, model_name=None):
+        self.embeddings = embeddings
+        self.cache = cache or get_default_cache()
+        self.model_name = model_name or getattr(embeddings, "model", type(embeddings).__name__)
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        vectors = self.cache.get_many(self.model_name, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            unique = _unique_missing(self.model_name, texts, missing)
+            computed = self.embeddings.embed_documents([texts[i] for i in unique])
+            self.cache.put_many(self.model_name, [texts[i] for i in unique], computed)
+            by_key = {
+                cache_key(self.model_name, texts[i]): list(vector)
+                for i, vector in zip(unique, computed)
+            }
+            for i in missing:
+                vectors[i] = by_key[cache_key(self.model_name, texts[i])]
+
+        return vectors
+
+    def embed_query(self, text):
+        vector = self.cache.get_many(self.model_name, [text])[0]
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_many(self.model_name, [text], [vector])
+        return list(vector)
+
+
+class CachedSentenceEncoder:
+    """Drop-in for SentenceTransformer.encode that returns float32 numpy arrays from the cache."""
+
+    def __init__(self, model, model_name, cache=None):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache or get_default_cache()
+
+    def encode(self, sentences, **kwargs):
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        vectors = self.cache.get_many(self.model_name, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            kwargs["convert_to_numpy"] = True
+            kwargs.pop("convert_to_tensor", None)
+            unique = _unique_missing(self.model_name, texts, missing)
+            computed = self.model.encode([texts[i] for i in unique], **kwargs)
+            self.cache.put_many(self.model_name, [texts[i] for i in unique], computed.tolist())
+            by_key = {
+                cache_key(self.model_name, texts[i]): vector
+                for i, vector in zip(unique, computed)
+            }
+            for i in missing:
+                vectors[i] = by_key[cache_key(self.model_name, texts[i])]
+
+        result = np.asarray(vectors, dtype=np.float32)
+        return result[0] if single else result
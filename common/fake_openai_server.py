@@ -0,0 +1,166 @@
+"""
+Local stand-in for the OpenAI embeddings and completions endpoints, for
+exercising the batched index builder and streaming answers without network
+access or API spend.
+
+Usage:
+    python fake_openai_server.py --port 8765 --fail-rate 0.2 --token-delay 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake python <script>
+
+Embedding vectors are deterministic per input. Completions answer with a
+fixed text, streamed token by token (server-sent events) when "stream" is
+set. --fail-rate randomly answers with 429 / 500 so retry and checkpoint
+behaviour can be observed.
+"""
+import json
+import math
+import time
+import base64
+import random
+import hashlib
+import argparse
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = "This is a fake answer streamed one token at a time from the local test server."
+
+
+def fake_vector(item, dim):
+    """Deterministic unit vector for a string or a list of token ids."""
+    key = item if isinstance(item, str) else json.dumps(item)
+    rng = random.Random(hashlib.md5(key.encode("utf-8")).hexdigest())
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def make_handler(dim, fail_rate, stats, answer, first_token_delay, token_delay):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            stats["requests"] += 1
+
+            if random.random() < fail_rate:
+                stats["failures"] += 1
+                status = random.choice([429, 500])
+                return self._send(status, {"error": {"message": "injected failure", "code": status}})
+
+            if self.path.endswith("/embeddings"):
+                return self._embeddings(body)
+            if self.path.endswith("/chat/completions"):
+                return self._completion(body, chat=True)
+            if self.path.endswith("/completions"):
+                return self._completion(body, chat=False)
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        def _embeddings(self, body):
+            inputs = body.get("input", [])
+            if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+
+            data = []
+            for i, item in enumerate(inputs):
+                vector = fake_vector(item, dim)
+                if body.get("encoding_format") == "base64":
+                    vector = base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+                data.append({"object": "embedding", "index": i, "embedding": vector})
+
+            stats["inputs"] += len(inputs)
+            self._send(200, {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "fake"),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            })
+
+        def _choice(self, text, chat, stream, finish_reason=None):
+            if chat:
+                key = "delta" if stream else "message"
+                content = {"role": "assistant", "content": text}
+                return {"index": 0, key: content, "finish_reason": finish_reason}
+            return {"index": 0, "text": text, "logprobs": None, "finish_reason": finish_reason}
+
+        def _completion(self, body, chat):
+            stats["completions"] += 1
+            model = body.get("model", "fake")
+            obj = "chat.completion" if chat else "text_completion"
+            usage = {"prompt_tokens": 0, "completion_tokens": len(answer.split()), "total_tokens": 0}
+
+            if not body.get("stream"):
+                return self._send(200, {
+                    "id": "fake", "object": obj, "created": int(time.time()), "model": model,
+                    "choices": [self._choice(answer, chat, stream=False, finish_reason="stop")],
+                    "usage": usage,
+                })
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+
+            time.sleep(first_token_delay)
+            tokens = [word + " " for word in answer.split()]
+            for token in tokens:
+                self._event({
+                    "id": "fake", "object": f"{obj}.chunk" if chat else obj,
+                    "created": int(time.time()), "model": model,
+                    "choices": [self._choice(token, chat, stream=True)],
+                })
+                time.sleep(token_delay)
+            self._event({
+                "id": "fake", "object": f"{obj}.chunk" if chat else obj,
+                "created": int(time.time()), "model": model,
+                "choices": [self._choice("", chat, stream=True, finish_reason="stop")],
+            })
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def _event(self, payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def _send(self, status, payload):
+            raw = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8765, dim=1536, fail_rate=0.0, answer=DEFAULT_ANSWER,
+          first_token_delay=0.5, token_delay=0.05):
+    """Create the server (call serve_forever to run it); returns the server and its stats dict."""
+    stats = {"requests": 0, "failures": 0, "inputs": 0, "completions": 0}
+    handler = make_handler(dim, fail_rate, stats, answer, first_token_delay, token_delay)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    return server, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI embeddings/completions server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--answer", default=DEFAULT_ANSWER)
+    parser.add_argument("--first-token-delay", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server, stats = serve(
+        args.port, args.dim, args.fail_rate, args.answer,
+        args.first_token_delay, args.token_delay
+    )
+    print(f"Fake OpenAI server on http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
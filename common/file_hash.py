@@ -0,0 +1,17 @@
+import hashlib
+
+BLOCK_SIZE = 1024 * 1024  # 1 MB blocks keep memory flat for large PDFs
+
+
+def hash_file(path, block_size=BLOCK_SIZE):
+    """Get MD5 hash of a file by streaming it in fixed-size blocks."""
+    hasher = hashlib.md5()
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
@@ -0,0 +1,55 @@
+"""
+Deterministic local embedding stand-in for benchmarks: feature-hashed,
+sublinear-TF word and word-bigram counts, L2-normalized. Texts sharing words
+get similar vectors, so retrieval quality numbers are meaningful, while runs
+are reproducible and make no API calls.
+"""
+import re
+import hashlib
+import numpy as np
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:
+    Embeddings = object
+
+WORD_RE = re.compile(r"\w+")
+DEFAULT_DIM = 1536  # same width as OpenAI embeddings, so index sizes compare
+
+
+def _bucket(feature, dim):
+    digest = hashlib.md5(feature.encode("utf-8")).digest()
+    index = int.from_bytes(digest[:4], "little") % dim
+    sign = 1.0 if digest[4] & 1 else -1.0
+    return index, sign
+
+
+class HashingEmbeddings(Embeddings):
+    """LangChain Embeddings that never leave the machine."""
+
+    def __init__(self, dim=DEFAULT_DIM):
+        self.dim = dim
+        self._buckets = {}
+
+    def _vector(self, text):
+        words = WORD_RE.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        counts = {}
+        for feature in features:
+            counts[feature] = counts.get(feature, 0) + 1
+        for feature, count in counts.items():
+            bucket = self._buckets.get(feature)
+            if bucket is None:
+                bucket = self._buckets[feature] = _bucket(feature, self.dim)
+            vector[bucket[0]] += bucket[1] * (1.0 + np.log(count))
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts):
+        return [self._vector(text).tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text).tolist()
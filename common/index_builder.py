@@ -0,0 +1,189 @@
+import os
+import time
+import random
+import shutil
+import hashlib
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _encoding = None
+
+MAX_BATCH_TOKENS = 8000   # well under the 8191-token limit per embeddings request
+MAX_BATCH_ITEMS = 256
+MAX_WORKERS = 4
+MAX_RETRIES = 6
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RETRY_ERRORS = {"APIConnectionError", "APITimeoutError", "Timeout", "ConnectionError"}
+
+
+def count_tokens(text):
+    """Token count with tiktoken when available, otherwise a ~4 chars/token estimate."""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def make_batches(texts, max_tokens=MAX_BATCH_TOKENS, max_items=MAX_BATCH_ITEMS):
+    """Split texts into lists of indices whose token total stays under max_tokens."""
+    batches = []
+    current = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_retryable(exc):
+    """429 / 5xx responses and connection problems are worth retrying."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status in RETRY_STATUS or type(exc).__name__ in RETRY_ERRORS
+
+
+def embed_with_retry(embeddings, texts, max_retries=MAX_RETRIES, base_delay=1.0, max_delay=60.0):
+    """Call embed_documents, retrying retryable errors with full-jitter exponential backoff."""
+    for attempt in range(max_retries + 1):
+        try:
+            return embeddings.embed_documents(texts)
+        except Exception as exc:
+            if attempt == max_retries or not is_retryable(exc):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            print(f"Embedding request failed ({exc}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _checkpoint_path(checkpoint_dir, batch_texts):
+    """Checkpoint files are named by batch content, so stale checkpoints are never reused."""
+    hasher = hashlib.md5()
+    for text in batch_texts:
+        hasher.update(text.encode("utf-8"))
+        hasher.update(b"\x00")
+    return os.path.join(checkpoint_dir, f"batch_{hasher.hexdigest()}.f32")
+
+
+def _load_checkpoint(path, count):
+    try:
+        with open(path, "rb") as f:
+            flat = array("f")
+            flat.frombytes(f.read())
+    except FileNotFoundError:
+        return None
+    if count == 0 or len(flat) % count:
+        return None
+    dim = len(flat) // count
+    return [flat[i * dim:(i + 1) * dim].tolist() for i in range(count)]
+
+
+def _save_checkpoint(path, vectors):
+    flat = array("f")
+    for vector in vectors:
+        flat.extend(vector)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(flat.tobytes())
+    os.replace(tmp_path, path)
+
+
+def embed_documents_batched(
+    embeddings,
+    texts,
+    checkpoint_dir=None,
+    max_tokens=MAX_BATCH_TOKENS,
+    max_workers=MAX_WORKERS,
+    max_retries=MAX_RETRIES,
+    progress=None,
+):
+    """
+    Embed texts in token-aware batches with a bounded number of concurrent
+    requests. Completed batches are written to checkpoint_dir, so a crashed
+    build resumes from where it stopped instead of starting over.
+    """
+    texts = list(texts)
+    batches = make_batches(texts, max_tokens=max_tokens)
+    vectors = [None] * len(texts)
+
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def run_batch(batch):
+        batch_texts = [texts[i] for i in batch]
+        path = _checkpoint_path(checkpoint_dir, batch_texts) if checkpoint_dir else None
+
+        batch_vectors = _load_checkpoint(path, len(batch_texts)) if path else None
+        if batch_vectors is None:
+            batch_vectors = embed_with_retry(embeddings, batch_texts, max_retries=max_retries)
+            if path:
+                _save_checkpoint(path, batch_vectors)
+        return batch, batch_vectors
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch, batch_vectors in pool.map(run_batch, batches):
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = list(vector)
+            done += 1
+            if progress:
+                progress(done, len(batches))
+
+    return vectors
+
+
+def iter_embedded_batches(batches, embeddings, window=MAX_WORKERS, checkpoint_dir=None,
+                          get_text=lambda item: item):
+    """
+    Embed an iterable of batches with at most `window` batches in flight and
+    yield (batch, vectors) in input order. Batches are pulled lazily, so the
+    producer (PDF parsing, chunking) overlaps with embedding while memory
+    stays bounded by the window.
+    """
+    with ThreadPoolExecutor(max_workers=window) as pool:
+        inflight = deque()
+        for batch in batches:
+            texts = [get_text(item) for item in batch]
+            future = pool.submit(
+                embed_documents_batched, embeddings, texts,
+                checkpoint_dir=checkpoint_dir, max_workers=1
+            )
+            inflight.append((batch, future))
+            if len(inflight) >= window:
+                done_batch, done_future = inflight.popleft()
+                yield done_batch, done_future.result()
+
+        while inflight:
+            done_batch, done_future = inflight.popleft()
+            yield done_batch, done_future.result()
+
+
+def clear_checkpoints(checkpoint_dir):
+    """Remove checkpoints once the index has been saved."""
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+
+def build_faiss_index(docs, embeddings, checkpoint_dir=None, ids=None, **kwargs):
+    """Build a LangChain FAISS store from docs using the batched, resumable pipeline."""
+    from langchain_community.vectorstores import FAISS
+
+    texts = [doc.page_content for doc in docs]
+    vectors = embed_documents_batched(embeddings, texts, checkpoint_dir=checkpoint_dir, **kwargs)
+    vector_store = FAISS.from_embeddings(
+        list(zip(texts, vectors)),
+        embeddings,
+        metadatas=[doc.metadata for doc in docs],
+        ids=ids,
+    )
+    return vector_store
@@ -0,0 +1,119 @@
+import os
+import math
+import numpy as np
+import faiss
+
+# flat | ivf_flat | hnsw | ivf_pq
+INDEX_TYPE = os.environ.get("RAG_INDEX_TYPE", "flat")
+# Below this many vectors a flat index is both exact and fast enough
+MIN_ANN_VECTORS = int(os.environ.get("RAG_MIN_ANN_VECTORS", "5000"))
+# FAISS k-means wants at least this many training points per centroid
+TRAIN_POINTS_PER_CENTROID = 39
+
+DEFAULT_PARAMS = {
+    "nlist": None,          # IVF cells; None → 4 * sqrt(n)
+    "nprobe": 16,           # IVF cells visited per query
+    "hnsw_m": 32,           # HNSW graph degree
+    "ef_construction": 80,
+    "ef_search": 64,        # HNSW candidate list size per query
+    "pq_m": 64,             # PQ sub-quantizers (must divide the dimension)
+    "pq_nbits": 8,
+    "train_per_list": 64,   # training sample size per IVF cell
+}
+
+
+def _params(overrides):
+    params = dict(DEFAULT_PARAMS)
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def auto_nlist(ntotal):
+    """4·√n cells, capped so every cell gets at least ~39 training points."""
+    return max(1, min(int(4 * math.sqrt(ntotal)), ntotal // TRAIN_POINTS_PER_CENTROID))
+
+
+def min_ann_vectors(index_type, **overrides):
+    """
+    Smallest store converted to index_type: MIN_ANN_VECTORS, or more when the
+    index cannot be trained on fewer. IVF-PQ trains 2^pq_nbits centroids per
+    sub-quantizer (9984 points at 8 bits); a fixed nlist needs 39 per cell.
+    """
+    params = _params(overrides)
+    minimum = MIN_ANN_VECTORS
+    if index_type == "ivf_pq":
+        minimum = max(minimum, TRAIN_POINTS_PER_CENTROID * 2 ** params["pq_nbits"])
+    if index_type in ("ivf_flat", "ivf_pq") and params["nlist"]:
+        minimum = max(minimum, TRAIN_POINTS_PER_CENTROID * params["nlist"])
+    return minimum
+
+
+def make_index(index_type, dim, ntotal, **overrides):
+    """Build an empty (untrained) FAISS index of the requested type."""
+    params = _params(overrides)
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["hnsw_m"])
+        index.hnsw.efConstruction = params["ef_construction"]
+        return index
+
+    nlist = params["nlist"] or auto_nlist(ntotal)
+    if index_type == "ivf_flat":
+        return faiss.index_factory(dim, f"IVF{nlist},Flat")
+    if index_type == "ivf_pq":
+        return faiss.index_factory(dim, f"IVF{nlist},PQ{params['pq_m']}x{params['pq_nbits']}")
+    raise ValueError(f"Unknown index type: {index_type}")
+
+
+def tune_index(index, **overrides):
+    """Apply query-time knobs (nprobe for IVF, efSearch for HNSW) to a loaded index."""
+    params = _params(overrides)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(params["nprobe"], ivf.nlist)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = params["ef_search"]
+    return index
+
+
+def is_flat_index(index):
+    return isinstance(index, faiss.IndexFlat)
+
+
+def build_index(vectors, index_type=INDEX_TYPE, seed=0, **overrides):
+    """Train (on a random sample) and fill an index from an (n, dim) float32 array."""
+    params = _params(overrides)
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    ntotal, dim = vectors.shape
+    index = make_index(index_type, dim, ntotal, **overrides)
+
+    if not index.is_trained:
+        ivf = faiss.try_extract_index_ivf(index)
+        sample_size = min(ntotal, max(ivf.nlist * params["train_per_list"], 10000))
+        sample = vectors[np.random.default_rng(seed).choice(ntotal, sample_size, replace=False)]
+        index.train(sample)
+
+    # Add in slices to keep temporary copies small
+    for start in range(0, ntotal, 65536):
+        index.add(vectors[start:start + 65536])
+    return tune_index(index, **overrides)
+
+
+def convert_store_index(vector_store, index_type=INDEX_TYPE, **overrides):
+    """
+    Re-pack a LangChain FAISS store's flat index into the configured ANN index.
+    Vector positions are preserved, so index_to_docstore_id stays valid.
+    Stores too small for the index type stay flat.
+    """
+    index = vector_store.index
+    if (
+        index_type == "flat"
+        or not is_flat_index(index)
+        or index.ntotal < min_ann_vectors(index_type, **overrides)
+    ):
+        return vector_store
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+    vector_store.index = build_index(vectors, index_type=index_type, **overrides)
+    return vector_store